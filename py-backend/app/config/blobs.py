@@ -0,0 +1,18 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Content-addressed storage for images that used to be embedded as base64 in
+# documents and settings. "local" keeps files under BLOB_DIR, "gridfs" stores
+# them in the BLOB_BUCKET GridFS bucket of the application database.
+BLOB_BACKEND = os.getenv("BLOB_BACKEND", "local")
+BLOB_DIR = os.getenv("BLOB_DIR", "blobs")
+BLOB_BUCKET = os.getenv("BLOB_BUCKET", "blobs")
+# Where the blob routes are mounted.
+BLOB_URL_PREFIX = os.getenv("BLOB_URL_PREFIX", "/api/blobs")
+
+# Blobs are served from the API origin, so only these image types are accepted
+# (checked against the bytes, not just the declared type), up to MAX_BLOB_BYTES.
+BLOB_CONTENT_TYPES = [t.strip() for t in os.getenv("BLOB_CONTENT_TYPES", "image/png,image/jpeg,image/webp").split(",") if t.strip()]
+MAX_BLOB_BYTES = int(os.getenv("MAX_BLOB_BYTES", 10 * 1024 * 1024))
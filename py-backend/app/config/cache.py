@@ -0,0 +1,14 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per-process read-through cache of business settings. Entries expire after
+# SETTINGS_CACHE_TTL seconds and the least recently used ones are dropped past
+# SETTINGS_CACHE_MAX_ENTRIES. Writes through this process update the cache
+# directly; with SETTINGS_CACHE_WATCH=true a MongoDB change stream (replica set
+# or Atlas only) also invalidates entries written by other workers, otherwise
+# the TTL bounds how stale they can get.
+SETTINGS_CACHE_TTL = float(os.getenv("SETTINGS_CACHE_TTL", 60))
+SETTINGS_CACHE_MAX_ENTRIES = int(os.getenv("SETTINGS_CACHE_MAX_ENTRIES", 10000))
+SETTINGS_CACHE_WATCH = os.getenv("SETTINGS_CACHE_WATCH", "false").lower() in ("1", "true", "yes")
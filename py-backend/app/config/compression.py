@@ -0,0 +1,13 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Response compression for text-like payloads (JSON, NDJSON, text). Bodies under
+# COMPRESSION_MIN_SIZE bytes are sent as-is. Brotli is used when the client
+# accepts it and the `brotli` package is installed, gzip otherwise.
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+# 0-11; the default favours speed, as responses are compressed per request.
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
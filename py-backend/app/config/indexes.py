@@ -0,0 +1,78 @@
+import logging
+from datetime import datetime
+from typing import Dict, List, Any
+from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Declarative index definitions per collection, created (or verified) on startup.
+# Keep these in step with the query shapes below and the filters used in app/routes.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "documents": [
+        # by-id lookups scoped to a business, and keyset pagination (_id desc)
+        IndexModel([("business_id", ASCENDING), ("_id", DESCENDING)], name="business_id_id"),
+        IndexModel([("business_id", ASCENDING), ("status", ASCENDING), ("date", DESCENDING)], name="business_id_status_date"),
+        # multikey: one entry per awaited signer, for a signer's pending queue
+        IndexModel([("pendingSigners", ASCENDING), ("business_id", ASCENDING), ("_id", DESCENDING)], name="pendingSigners_business_id_id"),
+    ],
+    "contracts": [
+        IndexModel([("business_id", ASCENDING), ("_id", DESCENDING)], name="business_id_id"),
+        IndexModel([("business_id", ASCENDING), ("status", ASCENDING), ("date", DESCENDING)], name="business_id_status_date"),
+    ],
+    "settings": [
+        IndexModel([("business_id", ASCENDING)], name="business_id_unique", unique=True),
+    ],
+    "contractmanagements": [
+        # one state document per business
+        IndexModel([("business_id", ASCENDING)], name="business_id_unique", unique=True),
+    ],
+    "businessstats": [
+        IndexModel([("business_id", ASCENDING)], name="business_id_unique", unique=True),
+    ],
+    "renderjobs": [
+        # recovery sweeps of queued / stale running jobs
+        IndexModel([("status", ASCENDING), ("updatedAt", ASCENDING)], name="status_updatedAt"),
+    ],
+}
+
+# Representative queries issued by the routes, explained by the diagnostics
+# endpoint to catch collection scans. Each entry builds a find command for a
+# sample business_id.
+QUERY_SHAPES: List[Dict[str, Any]] = [
+    {"name": "documents.list", "collection": "documents",
+     "find": lambda b: {"filter": {"business_id": b}, "sort": {"_id": -1}, "limit": 50}},
+    {"name": "documents.by_id", "collection": "documents",
+     "find": lambda b: {"filter": {"_id": ObjectId(), "business_id": b}}},
+    {"name": "documents.by_status", "collection": "documents",
+     "find": lambda b: {"filter": {"business_id": b, "status": "waiting"}, "sort": {"date": -1}}},
+    {"name": "documents.pending_signer", "collection": "documents",
+     "find": lambda b: {"filter": {"pendingSigners": "signer@example.com", "business_id": b}, "sort": {"_id": -1}, "limit": 50}},
+    {"name": "contracts.list", "collection": "contracts",
+     "find": lambda b: {"filter": {"business_id": b}, "sort": {"_id": -1}, "limit": 50}},
+    {"name": "contracts.by_id", "collection": "contracts",
+     "find": lambda b: {"filter": {"_id": ObjectId(), "business_id": b}}},
+    {"name": "contracts.by_status", "collection": "contracts",
+     "find": lambda b: {"filter": {"business_id": b, "status": "active"}, "sort": {"date": -1}}},
+    {"name": "settings.by_business", "collection": "settings",
+     "find": lambda b: {"filter": {"business_id": b}}},
+    {"name": "contractmanagements.by_business", "collection": "contractmanagements",
+     "find": lambda b: {"filter": {"business_id": b}}},
+    {"name": "businessstats.by_business", "collection": "businessstats",
+     "find": lambda b: {"filter": {"business_id": b}}},
+    {"name": "renderjobs.recover", "collection": "renderjobs",
+     "find": lambda b: {"filter": {"status": "running", "updatedAt": {"$lt": datetime.now()}}}},
+]
+
+async def ensure_indexes(database) -> Dict[str, List[str]]:
+    # create_indexes is a no-op for indexes that already exist with the same
+    # spec. Failures (e.g. duplicate business_ids blocking a unique index) are
+    # logged rather than stopping the app from starting.
+    created = {}
+    for collection, indexes in INDEXES.items():
+        try:
+            created[collection] = await database[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            logger.error("Could not create indexes on %s: %s", collection, e)
+    return created
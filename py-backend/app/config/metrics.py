@@ -0,0 +1,14 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per-route latency, payload sizes and MongoDB / validation / serialization time,
+# exposed in Prometheus text format on METRICS_PATH.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+
+# Debug only: `?profile=1` on any request returns a sampled stack profile of
+# that request (folded stacks, for flamegraph.pl / speedscope) instead of its body.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.001))
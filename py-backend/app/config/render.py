@@ -0,0 +1,54 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Where uploaded PDFs live. `uploadPath` values are relative to it; files outside it are never read.
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+
+# Rendered page images are written to RENDER_DIR/<document id>/ and served under RENDER_URL_PREFIX.
+RENDER_DIR = os.getenv("RENDER_DIR", "images")
+RENDER_URL_PREFIX = os.getenv("RENDER_URL_PREFIX", "/images")
+
+# Every page is decoded once and written in up to three sizes: the screen image used by the
+# editor (RENDER_DPI), a thumbnail RENDER_THUMBNAIL_WIDTH pixels wide for list views, and an
+# optional print image at RENDER_PRINT_DPI (0 disables it). Formats: jpeg, png, webp, avif.
+RENDER_DPI = int(os.getenv("RENDER_DPI", 150))
+RENDER_FORMAT = os.getenv("RENDER_FORMAT", "jpeg")
+RENDER_THUMBNAIL_WIDTH = int(os.getenv("RENDER_THUMBNAIL_WIDTH", 200))
+RENDER_THUMBNAIL_FORMAT = os.getenv("RENDER_THUMBNAIL_FORMAT", "webp")
+RENDER_PRINT_DPI = int(os.getenv("RENDER_PRINT_DPI", 0))
+RENDER_PRINT_FORMAT = os.getenv("RENDER_PRINT_FORMAT", "jpeg")
+
+# Size of the process pool used for rasterization. Defaults to the CPU count.
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", os.cpu_count() or 1))
+
+# Pages per render task, and how many of one document's windows may be queued on the pool
+# at once. Each finished window is persisted (and progress updated) as it lands and the next
+# one is submitted, so concurrent jobs share the workers instead of queueing behind each other.
+RENDER_WINDOW = int(os.getenv("RENDER_WINDOW", 4))
+RENDER_WINDOWS_IN_FLIGHT = int(os.getenv("RENDER_WINDOWS_IN_FLIGHT", 2))
+
+# Background render jobs: concurrent jobs per process, attempts before giving up, base retry
+# delay (doubled per attempt) and how long a "running" job may go without a heartbeat before
+# it is considered orphaned by a crashed process. Running jobs heartbeat several times per
+# stale window, and every process sweeps for orphaned jobs at startup and every
+# RENDER_JOB_SWEEP_INTERVAL seconds.
+RENDER_JOB_WORKERS = int(os.getenv("RENDER_JOB_WORKERS", os.cpu_count() or 1))
+RENDER_JOB_MAX_ATTEMPTS = int(os.getenv("RENDER_JOB_MAX_ATTEMPTS", 3))
+RENDER_JOB_RETRY_DELAY = float(os.getenv("RENDER_JOB_RETRY_DELAY", 5))
+RENDER_JOB_STALE_SECONDS = int(os.getenv("RENDER_JOB_STALE_SECONDS", 60))
+RENDER_JOB_SWEEP_INTERVAL = float(os.getenv("RENDER_JOB_SWEEP_INTERVAL", 30))
+
+# Content-addressed cache of rendered pages, keyed by PDF SHA-256 + DPI + format and shared
+# across documents and businesses. Least recently used entries are evicted past the size bound.
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "render-cache")
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", 2 * 1024 ** 3))
+
+# Flattened PDFs (canvas elements stamped onto the upload), one per document revision. They
+# are built on a process pool of their own (FLATTEN_WORKERS) so downloads never queue behind
+# page rendering. Superseded revisions are removed once unused for FLATTEN_RETENTION_SECONDS,
+# which leaves downloads that are still streaming them alone.
+FLATTEN_CACHE_DIR = os.getenv("FLATTEN_CACHE_DIR", "flattened")
+FLATTEN_WORKERS = int(os.getenv("FLATTEN_WORKERS", 2))
+FLATTEN_RETENTION_SECONDS = int(os.getenv("FLATTEN_RETENTION_SECONDS", 600))
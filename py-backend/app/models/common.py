@@ -1,24 +1,22 @@
 from typing import Optional, List, Union, Literal
-from pydantic import BaseModel, Field
+from datetime import datetime
+from typing_extensions import Annotated
+from pydantic import BaseModel, Field, BeforeValidator
 
 class ISigner(BaseModel):
     name: str
     email: str
     type: Literal['signer', 'approver', 'cc']
     order: Optional[int] = None
+    # Set by the signing workflow; cc recipients never sign.
+    status: Optional[Literal['pending', 'signed']] = None
+    signedAt: Optional[datetime] = None
 
 class IDocumentVariable(BaseModel):
     name: str
     value: str
     isSystem: Optional[bool] = None
 
-class BoxSpacing(BaseModel):
-    top: int = 0
-    right: int = 0
-    bottom: int = 0
-    left: int = 0
-
-# Correction: python uses float or int, no 'number'. Using float for safe measure or int. 
 # Typescript number is float.
 class BoxSpacing(BaseModel):
     top: float = 0
@@ -32,93 +30,78 @@ class BlockStyle(BaseModel):
     margin: Optional[BoxSpacing] = None
 
 # Elements
-class TextElement(BaseModel):
-    type: Literal['text-field']
+# Fillable fields are absolutely positioned on a page; blocks flow in `order`.
+class FieldElement(BaseModel):
     id: str
     x: float
     y: float
     width: float
     height: float
-    content: str
     page: int
+
+    class Config:
+        # Geometry is indexed and drawn; NaN and infinity have no position.
+        allow_inf_nan = False
+
+class BlockElement(BlockStyle):
+    id: str
+    order: int
+    height: float
+    page: int
+
+    class Config:
+        allow_inf_nan = False
+
+class TextElement(FieldElement):
+    type: Literal['text-field']
+    content: str
     fontSize: Optional[float] = None
     color: Optional[str] = None
     required: Optional[bool] = None
     placeholder: Optional[str] = None
-    # Extra fields from BlockStyle/others not explicitly in interface but maybe needed?
-    # Interface says: textDecoration, textAlign, fontStyle, fontWeight
     textDecoration: Optional[str] = None
     textAlign: Optional[str] = None
     fontStyle: Optional[str] = None
     fontWeight: Optional[str] = None
 
-class ImageElement(BlockStyle):
+class ImageElement(BlockElement):
     type: Literal['image']
-    id: str
-    order: int
-    height: float
     width: Optional[float] = None
     imageData: Optional[str] = None
+    # SHA-256 of the image in the blob store (GET /api/blobs/{hash}); replaces inline imageData.
+    imageBlob: Optional[str] = None
     imageUrl: Optional[str] = None
-    page: int
     align: Optional[Literal['left', 'center', 'right']] = None
     imageEffect: Optional[Literal['none', 'grayscale']] = None
 
-class SignatureElement(BaseModel):
+class SignatureElement(FieldElement):
     type: Literal['signature']
-    id: str
-    x: float
-    y: float
-    width: float
-    height: float
-    imageData: str
-    page: int
+    imageData: Optional[str] = None
+    imageBlob: Optional[str] = None
     content: Optional[str] = None
     showSignerName: Optional[bool] = None
 
-class DateElement(BaseModel):
+class DateElement(FieldElement):
     type: Literal['date']
-    id: str
-    x: float
-    y: float
-    width: float
-    height: float
     value: Optional[str] = None
-    page: int
     placeholder: Optional[str] = None
     dateFormat: Optional[str] = None
     availableDates: Optional[str] = None
     required: Optional[bool] = None
 
-class InitialsElement(BaseModel):
+class InitialsElement(FieldElement):
     type: Literal['initials']
-    id: str
-    x: float
-    y: float
-    width: float
-    height: float
     content: str
-    page: int
 
-class CheckboxElement(BaseModel):
+class CheckboxElement(FieldElement):
     type: Literal['checkbox']
-    id: str
-    x: float
-    y: float
-    width: float
-    height: float
     checked: bool
-    page: int
     required: Optional[bool] = None
 
-class HeadingElement(BlockStyle):
+class HeadingElement(BlockElement):
     type: Literal['heading']
-    id: str
-    order: int
-    height: float
     content: str
     subtitle: Optional[str] = None
-    page: int
     fontSize: Optional[float] = None
     fontWeight: Optional[str] = None
     subtitleFontSize: Optional[float] = None
@@ -131,24 +114,16 @@ class HeadingElement(BlockStyle):
     fontFamily: Optional[str] = None
     tagName: Optional[Literal['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'p']] = None
 
-class VideoElement(BlockStyle):
+class VideoElement(BlockElement):
     type: Literal['video']
-    id: str
-    order: int
-    height: float
     width: Optional[float] = None
     videoUrl: Optional[str] = None
-    page: int
 
-class TableElement(BlockStyle):
+class TableElement(BlockElement):
     type: Literal['table']
-    id: str
-    order: int
-    height: float
     rows: int
     columns: int
     data: Optional[List[List[str]]] = None
-    page: int
     textAlign: Optional[Literal['left', 'center', 'right']] = None
     fontStyle: Optional[Literal['normal', 'italic']] = None
     textDecoration: Optional[Literal['none', 'underline']] = None
@@ -162,13 +137,32 @@ class TableElement(BlockStyle):
 # BlockElement = HeadingElement | ImageElement | VideoElement | TableElement
 # FillableFieldElement = TextElement | SignatureElement | DateElement | InitialsElement | CheckboxElement
 
-CanvasElement = Union[
+ELEMENT_MODELS = (
     HeadingElement, ImageElement, VideoElement, TableElement,
     TextElement, SignatureElement, DateElement, InitialsElement, CheckboxElement
-]
+)
+
+# Tagged union: pydantic reads `type` and validates against that one model,
+# instead of trying each member in turn.
+CanvasElement = Annotated[Union[ELEMENT_MODELS], Field(discriminator="type")]
 
 class Page(BaseModel):
     pageSrc: Optional[str] = None
     fromPdf: bool = False
     imagePath: Optional[str] = None
     layout: List[CanvasElement] = []
+    # Extra renditions of PDF pages: a small thumbnail for list views and an
+    # optional high-DPI image for printing. pageSrc/imagePath stay the screen image.
+    thumbnailSrc: Optional[str] = None
+    thumbnailPath: Optional[str] = None
+    printSrc: Optional[str] = None
+    printPath: Optional[str] = None
+
+# Bulk create (insert_many) for migrations and imports.
+MAX_BULK_SIZE = 1000
+
+class BulkCreateResult(BaseModel):
+    insertedCount: int
+    ids: List[Annotated[str, BeforeValidator(str)]]
+    # Set (with status 207) when a later batch failed; ids are the documents created before it.
+    error: Optional[str] = None
@@ -26,6 +26,25 @@ class ContractModel(BaseModel):
         populate_by_name = True
         arbitrary_types_allowed = True
 
+class ContractSummary(BaseModel):
+    # List-view projection of ContractModel.
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    name: Optional[str] = None
+    status: Optional[str] = None
+    value: Optional[float] = None
+    currency: Optional[str] = None
+    date: Optional[datetime] = None
+    startDate: Optional[str] = None
+    endDate: Optional[str] = None
+    contractType: Optional[str] = None
+    business_id: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+
+CONTRACT_SUMMARY_FIELDS = ["name", "status", "value", "currency", "date", "startDate", "endDate", "contractType", "business_id"]
+
 class ContractUpdate(BaseModel):
     name: Optional[str] = None
     status: Optional[str] = None
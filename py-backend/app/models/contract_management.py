@@ -1,9 +1,9 @@
-from typing import Optional, List, Any, Union
+from typing import Optional, List, Any, Union, Dict
 from pydantic import BaseModel, Field, BeforeValidator
 from typing_extensions import Annotated
 from .settings import IdentityVerificationSettings, GlobalDocumentSettings, BrandingSettings
-from .document import DocumentModel
-from .contract import ContractModel
+from .document import DocumentSummary
+from .contract import ContractSummary
 
 PyObjectId = Annotated[str, BeforeValidator(str)]
 
@@ -24,6 +24,14 @@ class Stats(BaseModel):
     activeContracts: int = 0
     pendingSignatures: int = 0
     contractValue: float = 0
+    contractValueByCurrency: Dict[str, float] = {}
+
+class BusinessStats(BaseModel):
+    # Server-maintained counters for one business (see app/services/stats.py).
+    business_id: str
+    documentsFilters: DocumentsFilters = Field(default_factory=DocumentsFilters)
+    contractsFilters: ContractsFilters = Field(default_factory=ContractsFilters)
+    stats: Stats = Field(default_factory=Stats)
 
 class ContractManagementBase(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -42,12 +50,18 @@ class ContractManagementBase(BaseModel):
         arbitrary_types_allowed = True
 
 class ContractManagementModel(ContractManagementBase):
-    documents: List[PyObjectId] = [] 
-    contracts: List[PyObjectId] = []
+    # Documents and contracts are no longer embedded as id arrays; they are
+    # looked up by business_id when the state is populated.
+    pass
 
 class ContractManagementPopulated(ContractManagementBase):
-    documents: List[DocumentModel] = []
-    contracts: List[ContractModel] = []
+    # One page of each list (newest first) plus totals from the stats counters.
+    documents: List[DocumentSummary] = []
+    contracts: List[ContractSummary] = []
+    documentsTotal: int = 0
+    contractsTotal: int = 0
+    documentsNextCursor: Optional[str] = None
+    contractsNextCursor: Optional[str] = None
 
 class ContractManagementUpdate(BaseModel):
     documentsFilters: Optional[DocumentsFilters] = None
@@ -13,6 +13,7 @@ class DocumentModel(BaseModel):
     status: Literal['draft', 'waiting', 'completed', 'archived'] = 'draft'
     date: datetime = Field(default_factory=datetime.now)
     signers: List[ISigner] = []
+    # Percentage of signers/approvers who have signed.
     progress: int = 0
     dueDate: Optional[str] = None
     createdBy: Optional[str] = None
@@ -27,12 +28,47 @@ class DocumentModel(BaseModel):
     canvasElements: List[CanvasElement] = []
     pageDimensions: Optional[Dict[str, Dict[str, float]]] = None
     documentType: Optional[Literal['upload-existing', 'new_document']] = 'new_document'
+    # Incremented on every edit; used for optimistic concurrency.
+    revision: int = 0
+    # Lowercased emails of the signers whose signature is awaited right now
+    # (with signingOrder, only the lowest outstanding order). Maintained by the
+    # signing workflow and empty unless status is 'waiting'.
+    pendingSigners: List[str] = []
+    # Percentage of PDF pages rendered so far.
+    renderProgress: Optional[int] = None
 
     class Config:
         populate_by_name = True
         arbitrary_types_allowed = True
 
 
+class DocumentSummary(BaseModel):
+    # Lightweight list-view projection of DocumentModel without editor state.
+    # Every field is optional so `fields=` projections can trim it further;
+    # other DocumentModel fields can be requested and are passed through.
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    name: Optional[str] = None
+    status: Optional[str] = None
+    progress: Optional[int] = None
+    signers: Optional[List[ISigner]] = None
+    date: Optional[datetime] = None
+    dueDate: Optional[str] = None
+    totalPages: Optional[int] = None
+    documentType: Optional[str] = None
+    business_id: Optional[str] = None
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
+        extra = 'allow'
+
+SUMMARY_FIELDS = ["name", "status", "progress", "signers", "date", "dueDate", "totalPages", "documentType", "business_id"]
+
+class DocumentSummaryPage(BaseModel):
+    items: List[DocumentSummary] = []
+    nextCursor: Optional[str] = None
+
+
 class DocumentCreate(BaseModel):
     name: str = "Untitled Document"
     business_id: Optional[str] = None
@@ -72,3 +108,63 @@ class DocumentUpdate(BaseModel):
     totalPages: Optional[int] = None
     variables: Optional[List[IDocumentVariable]] = None
     pages: Optional[List[Page]] = None
+
+    # When given, the update only applies if the document is still at this revision.
+    revision: Optional[int] = None
+
+class ElementOperation(BaseModel):
+    # JSON-Patch-style edit of a single canvas element. Without `page` the
+    # operation targets canvasElements; with it, the layout of that page
+    # (1-based page number, i.e. pages[page - 1].layout).
+    #   add     - value is a full element
+    #   replace - value holds the fields to change on element `id`
+    #   move    - value holds new x/y/page; for layout elements `toPage` moves
+    #             the element to another page's layout and value is the full element
+    #   remove  - deletes element `id`
+    op: Literal['add', 'replace', 'move', 'remove']
+    id: Optional[str] = None
+    page: Optional[int] = Field(default=None, ge=1)
+    toPage: Optional[int] = Field(default=None, ge=1)
+    value: Optional[Dict[str, Any]] = None
+
+class DocumentPatch(BaseModel):
+    revision: int
+    operations: List[ElementOperation]
+
+class DocumentPatchResult(BaseModel):
+    id: PyObjectId = Field(alias="_id")
+    revision: int
+
+    class Config:
+        populate_by_name = True
+
+class ElementOverlap(BaseModel):
+    a: str
+    b: str
+    page: int
+    area: float
+
+class DocumentRelayout(BaseModel):
+    # Rescales canvasElements after the pages are rendered at another size:
+    # either the new pageDimensions, or the old and new render DPI.
+    revision: int
+    pageDimensions: Optional[Dict[str, Dict[str, float]]] = None
+    fromDpi: Optional[float] = Field(default=None, gt=0)
+    toDpi: Optional[float] = Field(default=None, gt=0)
+
+# Recipients per generate request; inserted in batches of MAX_BULK_SIZE.
+MAX_GENERATE_SIZE = 10000
+
+class TemplateRecipient(BaseModel):
+    # Values for the template's `{{ name }}` merge fields, on top of the
+    # template document's own variables.
+    variables: Dict[str, str] = {}
+    name: Optional[str] = None
+    signers: Optional[List[ISigner]] = None
+    dueDate: Optional[str] = None
+
+class DocumentGenerateRequest(BaseModel):
+    recipients: List[TemplateRecipient]
+
+class SignRequest(BaseModel):
+    email: str
@@ -0,0 +1,26 @@
+from typing import Optional, Literal
+from datetime import datetime
+from pydantic import BaseModel, Field, BeforeValidator
+from typing_extensions import Annotated
+
+PyObjectId = Annotated[str, BeforeValidator(str)]
+
+class RenderJobModel(BaseModel):
+    # _id is the id of the document being rendered, which makes jobs unique per document.
+    id: Optional[PyObjectId] = Field(alias="_id", default=None)
+    business_id: str
+    status: Literal['queued', 'running', 'completed', 'failed'] = 'queued'
+    totalPages: int = 0
+    progress: int = 0
+    attempts: int = 0
+    maxAttempts: int = 0
+    error: Optional[str] = None
+    # Process currently running the job.
+    owner: Optional[str] = None
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+
+    class Config:
+        populate_by_name = True
+        arbitrary_types_allowed = True
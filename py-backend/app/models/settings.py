@@ -34,6 +34,8 @@ class BrandingSettings(BaseModel):
     secondaryColor: str = ""
     accentColor: str = ""
     logo: Optional[str] = None
+    # Blob store hash of the logo; inline base64 logos are moved there on save.
+    logoBlob: Optional[str] = None
 
 class SettingsModel(BaseModel):
     id: Optional[PyObjectId] = Field(alias="_id", default=None)
@@ -0,0 +1,98 @@
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional, Tuple
+from app.config.blobs import BLOB_URL_PREFIX, BLOB_CONTENT_TYPES, MAX_BLOB_BYTES
+from app.services.blob_store import BlobError, check_image, get_blob_store, is_blob_hash
+from app.services.http_cache import etag_matches
+from app.services.instrumentation import InstrumentedRoute
+
+router = APIRouter(prefix=BLOB_URL_PREFIX, tags=["blobs"], route_class=InstrumentedRoute)
+
+# File extension per allowed content type, for Content-Disposition.
+EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
+def parse_range(header: str, length: int) -> Optional[Tuple[int, int]]:
+    # Single "bytes=start-end" / "bytes=start-" / "bytes=-suffix" range; None if unsatisfiable.
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        return None
+    start_text, _, end_text = spec.strip().partition("-")
+    try:
+        if not start_text:
+            suffix = int(end_text)
+            if suffix <= 0:
+                return None
+            return max(0, length - suffix), length - 1
+        start = int(start_text)
+        end = int(end_text) if end_text else length - 1
+    except ValueError:
+        return None
+    if start >= length or end < start:
+        return None
+    return start, min(end, length - 1)
+
+@router.post("", status_code=201)
+async def upload_blob(request: Request):
+    declared_length = request.headers.get("content-length")
+    if declared_length and declared_length.isdigit() and int(declared_length) > MAX_BLOB_BYTES:
+        raise HTTPException(status_code=413, detail=f"Blob is larger than {MAX_BLOB_BYTES} bytes")
+    # Read incrementally so an oversized body is refused without buffering it.
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > MAX_BLOB_BYTES:
+            raise HTTPException(status_code=413, detail=f"Blob is larger than {MAX_BLOB_BYTES} bytes")
+    data = bytes(body)
+    if not data:
+        raise HTTPException(status_code=400, detail="Empty body")
+
+    try:
+        content_type = check_image(data, request.headers.get("content-type"))
+    except BlobError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    blob_hash = await get_blob_store().put(data, content_type)
+    return {"hash": blob_hash, "length": len(data), "contentType": content_type}
+
+@router.get("/{blob_hash}")
+async def get_blob(blob_hash: str, request: Request):
+    if not is_blob_hash(blob_hash):
+        raise HTTPException(status_code=400, detail="Invalid blob hash")
+
+    store = get_blob_store()
+    info = await store.info(blob_hash)
+    if not info:
+        raise HTTPException(status_code=404, detail="Blob not found")
+
+    # Blobs stored before uploads were restricted to images may have any type;
+    # those are only ever served as opaque downloads.
+    media_type = info.get("contentType") or "application/octet-stream"
+    if media_type in BLOB_CONTENT_TYPES:
+        disposition = f'inline; filename="{blob_hash}.{EXTENSIONS.get(media_type, "bin")}"'
+    else:
+        media_type = "application/octet-stream"
+        disposition = f'attachment; filename="{blob_hash}"'
+
+    # Content-addressed, so the hash is a strong validator and the bytes never change.
+    headers = {
+        "ETag": f'"{blob_hash}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": disposition,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    length = info["length"]
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", f'"{blob_hash}"') == f'"{blob_hash}"':
+        byte_range = parse_range(range_header, length)
+        if not byte_range:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{length}"})
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{length}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(store.stream(blob_hash, start, end), status_code=206, media_type=media_type, headers=headers)
+
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(store.stream(blob_hash), media_type=media_type, headers=headers)
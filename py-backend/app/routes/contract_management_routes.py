@@ -1,77 +1,139 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import List, Optional
 from bson import ObjectId
+import asyncio
 from app.config.db import db
-from app.models.contract_management import ContractManagementModel, ContractManagementPopulated, ContractManagementUpdate
-# We need to manually populate
-from app.models.document import DocumentModel
-from app.models.contract import ContractModel
-
-router = APIRouter(prefix="/api/contract-management", tags=["contract_management"])
-
-async def populate_state(state_dict: dict) -> dict:
-    # Fetch documents
-    doc_ids = state_dict.get("documents", [])
-    if doc_ids:
-        docs = await db.documents.find({"_id": {"$in": doc_ids}}).to_list(None)
-    else:
-        docs = []
-    
-    # Fetch contracts
-    contract_ids = state_dict.get("contracts", [])
-    if contract_ids:
-        contracts = await db.contracts.find({"_id": {"$in": contract_ids}}).to_list(None)
-    else:
-        contracts = []
-        
+from app.models.contract_management import ContractManagementModel, ContractManagementPopulated, ContractManagementUpdate, BusinessStats
+from app.models.document import SUMMARY_FIELDS
+from app.models.contract import CONTRACT_SUMMARY_FIELDS
+from app.services.stats import get_stats, refresh_stats
+from app.services.pagination import MAX_PAGE_SIZE, fetch_page, build_projection
+from app.services.blob_store import BlobError, offload_branding
+from app.services.instrumentation import InstrumentedRoute
+
+router = APIRouter(prefix="/api/contract-management", tags=["contract_management"], route_class=InstrumentedRoute)
+
+class PopulationParams:
+    # Page sizes and cursors for the documents/contracts lists embedded in the state.
+    def __init__(
+        self,
+        documents_limit: int = Query(20, ge=0, le=MAX_PAGE_SIZE),
+        documents_cursor: Optional[str] = None,
+        contracts_limit: int = Query(20, ge=0, le=MAX_PAGE_SIZE),
+        contracts_cursor: Optional[str] = None,
+    ):
+        self.documents_limit = documents_limit
+        self.documents_cursor = documents_cursor
+        self.contracts_limit = contracts_limit
+        self.contracts_cursor = contracts_cursor
+
+async def _page(collection, business_id: str, limit: int, cursor: Optional[str], fields: List[str]):
+    if not limit:
+        return [], None
+    return await fetch_page(collection, {"business_id": business_id}, limit, cursor, build_projection(fields))
+
+async def populate_state(state_dict: dict, business_id: str, params: PopulationParams) -> dict:
+    # Fills in one summary-projected page of documents and contracts for the
+    # business plus the server-maintained counters, which override whatever was
+    # last PUT into the state document and provide the list totals.
+    state_dict.pop("documents", None)
+    state_dict.pop("contracts", None)
+
+    try:
+        stats, (docs, docs_cursor), (contracts, contracts_cursor) = await asyncio.gather(
+            get_stats(business_id),
+            _page(db.documents, business_id, params.documents_limit, params.documents_cursor, SUMMARY_FIELDS),
+            _page(db.contracts, business_id, params.contracts_limit, params.contracts_cursor, CONTRACT_SUMMARY_FIELDS),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    state_dict["documentsFilters"] = stats["documentsFilters"]
+    state_dict["contractsFilters"] = stats["contractsFilters"]
+    state_dict["stats"] = stats["stats"]
     state_dict["documents"] = docs
     state_dict["contracts"] = contracts
+    state_dict["documentsTotal"] = stats["documentsFilters"]["all"]
+    state_dict["contractsTotal"] = stats["contractsFilters"]["all"]
+    state_dict["documentsNextCursor"] = docs_cursor
+    state_dict["contractsNextCursor"] = contracts_cursor
     return state_dict
 
+@router.get("/stats", response_model=BusinessStats)
+async def get_business_stats(business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    return await get_stats(business_id)
+
+@router.post("/stats/refresh", response_model=BusinessStats)
+async def refresh_business_stats(business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # Recomputes the counters with one aggregation, e.g. after bulk changes made outside the API.
+    return await refresh_stats(business_id)
+
+def state_defaults(business_id: str, exclude=()) -> dict:
+    # Fields written when a business's state document is first created. Counters
+    # are left out: they live in businessstats and are maintained with $inc there.
+    new_state = ContractManagementModel(business_id=business_id)
+    return new_state.model_dump(
+        by_alias=True,
+        exclude={"id", "business_id", "documentsFilters", "contractsFilters", "stats", *exclude}
+    )
+
 @router.get("", response_model=ContractManagementPopulated)
-async def get_contract_management_state():
-    state = await db.contractmanagements.find_one()
-    
-    if not state:
-        new_state = ContractManagementModel()
-        state_dict = new_state.model_dump(by_alias=True, exclude=["id"])
-        if "business_id" in state_dict and state_dict["business_id"] is None:
-             state_dict["business_id"] = "global"
-             
-        res = await db.contractmanagements.insert_one(state_dict)
-        state = await db.contractmanagements.find_one({"_id": res.inserted_id})
-        
-    return await populate_state(state)
+async def get_contract_management_state(business_id: str, params: PopulationParams = Depends()):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # One state document per business, created on first read by an atomic upsert.
+    state = await db.contractmanagements.find_one_and_update(
+        {"business_id": business_id},
+        {"$setOnInsert": state_defaults(business_id)},
+        upsert=True,
+        return_document=True
+    )
+    return await populate_state(state, business_id, params)
 
 @router.put("", response_model=ContractManagementPopulated)
-async def update_contract_management_state(update: ContractManagementUpdate):
-    update_data = update.model_dump(exclude_unset=True)
+async def update_contract_management_state(update: ContractManagementUpdate, business_id: str, params: PopulationParams = Depends()):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # documentsFilters/contractsFilters/stats are computed server-side now and ignored here.
+    update_data = update.model_dump(exclude_unset=True, exclude={"documentsFilters", "contractsFilters", "stats"})
+    try:
+        await offload_branding(update_data.get("brandingCustomizationSettings"))
+    except BlobError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
+    update_ops = {"$setOnInsert": state_defaults(business_id, exclude=update_data.keys())}
+    if update_data:
+        update_ops["$set"] = update_data
+
     result = await db.contractmanagements.find_one_and_update(
-        {}, 
-        {"$set": update_data},
+        {"business_id": business_id},
+        update_ops,
         upsert=True,
         return_document=True
     )
-    return await populate_state(result)
+    return await populate_state(result, business_id, params)
 
 @router.post("/sync", response_model=ContractManagementPopulated)
-async def sync_documents_list():
-    docs_cursor = db.documents.find({}, {"_id": 1})
-    docs = await docs_cursor.to_list(None)
-    doc_ids = [d["_id"] for d in docs]
-    
-    contracts_cursor = db.contracts.find({}, {"_id": 1})
-    contracts = await contracts_cursor.to_list(None)
-    contract_ids = [c["_id"] for c in contracts]
-    
+async def sync_documents_list(business_id: str, params: PopulationParams = Depends()):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # Lists are populated by business_id on every read, so syncing only needs to
+    # recompute the counters and drop the id arrays older state documents embed.
     result = await db.contractmanagements.find_one_and_update(
-        {},
-        {"$set": {"documents": doc_ids, "contracts": contract_ids}},
+        {"business_id": business_id},
+        {"$unset": {"documents": "", "contracts": ""}, "$setOnInsert": state_defaults(business_id)},
         return_document=True,
         upsert=True
     )
-    
-    # Manual populate logic here too, though result contains just IDs.
-    # populate_state will read those IDs and fetch objects.
-    return await populate_state(result)
+
+    await refresh_stats(business_id)
+    return await populate_state(result, business_id, params)
@@ -1,18 +1,47 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from typing import List
 from bson import ObjectId
+from pymongo import ReturnDocument
 from app.config.db import db
 from app.models.contract import ContractModel, ContractUpdate
+from app.models.common import BulkCreateResult, MAX_BULK_SIZE
+from app.services.stats import record_contract_change, record_contract_inserts, refresh_stats
+from app.services.serialization import ResponseShape
+from app.services.ndjson import NDJSON_MEDIA_TYPE, export_ndjson, import_ndjson, model_loader
+from app.services.instrumentation import InstrumentedRoute
 
-router = APIRouter(prefix="/api/contracts", tags=["contracts"])
+router = APIRouter(prefix="/api/contracts", tags=["contracts"], route_class=InstrumentedRoute)
+
+contract_shape = ResponseShape(ContractModel)
 
 @router.get("", response_model=List[ContractModel])
 async def get_contracts(business_id: str):
     if not business_id:
         raise HTTPException(status_code=400, detail="business_id is required")
         
-    contracts = await db.contracts.find({"business_id": business_id}).to_list(1000)
-    return contracts
+    contracts = await db.contracts.find({"business_id": business_id}, contract_shape.projection).to_list(1000)
+    return contract_shape.response(contracts)
+
+@router.get("/export")
+async def export_contracts(business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    return StreamingResponse(
+        export_ndjson(db.contracts, {"business_id": business_id}),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="contracts-{business_id}.ndjson"'}
+    )
+
+@router.post("/import")
+async def import_contracts(business_id: str, request: Request):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    result = await import_ndjson(request.stream(), db.contracts, business_id, model_loader(ContractModel, business_id))
+    await refresh_stats(business_id)
+    return result
 
 @router.get("/{id}", response_model=ContractModel)
 async def get_contract_by_id(id: str, business_id: str):
@@ -22,24 +51,41 @@ async def get_contract_by_id(id: str, business_id: str):
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    contract = await db.contracts.find_one({"_id": ObjectId(id), "business_id": business_id})
+    contract = await db.contracts.find_one({"_id": ObjectId(id), "business_id": business_id}, contract_shape.projection)
     if not contract:
         raise HTTPException(status_code=404, detail="Contract not found")
         
-    return contract
+    return contract_shape.response(contract)
+
+def prepare_contract(contract: ContractModel, business_id: str) -> dict:
+    contract_dict = contract.model_dump(by_alias=True, exclude=["id"])
+    if contract.business_id != business_id:
+        contract_dict['business_id'] = business_id
+    return contract_dict
 
 @router.post("", response_model=ContractModel, status_code=201)
 async def create_contract(contract: ContractModel, business_id: str):
     if not business_id:
         raise HTTPException(status_code=400, detail="business_id is required")
     
-    contract_dict = contract.model_dump(by_alias=True, exclude=["id"])
-    if contract.business_id != business_id:
-        contract_dict['business_id'] = business_id
-        
-    new_contract = await db.contracts.insert_one(contract_dict)
-    created_contract = await db.contracts.find_one({"_id": new_contract.inserted_id})
-    return created_contract
+    contract_dict = prepare_contract(contract, business_id)
+    # insert_one adds the generated _id to contract_dict.
+    await db.contracts.insert_one(contract_dict)
+    await record_contract_change(business_id, None, contract_dict)
+    return contract_dict
+
+@router.post("/bulk", response_model=BulkCreateResult, status_code=201, response_model_exclude_none=True)
+async def create_contracts_bulk(contracts: List[ContractModel], business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not contracts or len(contracts) > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {MAX_BULK_SIZE} contracts")
+
+    docs = [prepare_contract(contract, business_id) for contract in contracts]
+    result = await db.contracts.insert_many(docs)
+    await record_contract_inserts(business_id, docs)
+    return {"insertedCount": len(result.inserted_ids), "ids": result.inserted_ids}
 
 @router.put("/{id}", response_model=ContractModel)
 async def update_contract(id: str, business_id: str, contract: ContractUpdate):
@@ -57,13 +103,16 @@ async def update_contract(id: str, business_id: str, contract: ContractUpdate):
     result = await db.contracts.find_one_and_update(
         {"_id": ObjectId(id), "business_id": business_id},
         {"$set": update_data},
-        return_document=True
+        return_document=ReturnDocument.BEFORE
     )
     
     if not result:
         raise HTTPException(status_code=404, detail="Contract not found")
-        
-    return result
+
+    # Same approach as update_document: diff the counters against the old contract.
+    updated = {**result, **update_data}
+    await record_contract_change(business_id, result, updated)
+    return updated
 
 @router.delete("/{id}")
 async def delete_contract(id: str, business_id: str):
@@ -77,5 +126,7 @@ async def delete_contract(id: str, business_id: str):
     
     if not result:
         raise HTTPException(status_code=404, detail="Contract not found")
+
+    await record_contract_change(business_id, result, None)
         
     return {"message": "Contract deleted successfully"}
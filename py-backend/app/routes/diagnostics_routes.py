@@ -0,0 +1,82 @@
+import asyncio
+from fastapi import APIRouter, Query
+from typing import Dict, Any, List
+from pymongo.errors import OperationFailure
+from app.config.db import db
+from app.config.indexes import QUERY_SHAPES
+from app.services.render_cache import render_cache
+from app.services.instrumentation import InstrumentedRoute
+
+router = APIRouter(prefix="/api/diagnostics", tags=["diagnostics"], route_class=InstrumentedRoute)
+
+def collect_plan(plan: Any, stages: List[str], indexes: List[str]):
+    # Walks a winning plan (classic or SBE layout) collecting stage and index names.
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        if "indexName" in plan:
+            indexes.append(plan["indexName"])
+        for value in plan.values():
+            collect_plan(value, stages, indexes)
+    elif isinstance(plan, list):
+        for value in plan:
+            collect_plan(value, stages, indexes)
+
+def summarize_explain(name: str, explain: Dict[str, Any], slow_ms: int) -> Dict[str, Any]:
+    stages: List[str] = []
+    indexes: List[str] = []
+    collect_plan(explain.get("queryPlanner", {}).get("winningPlan", {}), stages, indexes)
+    execution = explain.get("executionStats", {})
+    millis = execution.get("executionTimeMillis", 0)
+    return {
+        "name": name,
+        "stages": stages,
+        "indexes": indexes,
+        "collscan": "COLLSCAN" in stages,
+        "slow": millis >= slow_ms,
+        "executionTimeMillis": millis,
+        "nReturned": execution.get("nReturned", 0),
+        "totalKeysExamined": execution.get("totalKeysExamined", 0),
+        "totalDocsExamined": execution.get("totalDocsExamined", 0),
+    }
+
+@router.get("/query-plans")
+async def get_query_plans(business_id: str = "diagnostics", slow_ms: int = Query(100, ge=0)):
+    # Explains every registered query shape and flags collection scans and slow plans.
+    results = []
+    for shape in QUERY_SHAPES:
+        command = {"explain": {"find": shape["collection"], **shape["find"](business_id)}, "verbosity": "executionStats"}
+        try:
+            explain = await db.command(command)
+        except OperationFailure as e:
+            results.append({"name": shape["name"], "error": str(e)})
+            continue
+        results.append(summarize_explain(shape["name"], explain, slow_ms))
+
+    return {
+        "queries": results,
+        "collscans": [r["name"] for r in results if r.get("collscan")],
+        "slow": [r["name"] for r in results if r.get("slow")],
+    }
+
+@router.get("/slow-queries")
+async def get_slow_queries(slow_ms: int = Query(100, ge=0), limit: int = Query(50, ge=1, le=500)):
+    # Reads the database profiler, if enabled (db.setProfilingLevel(1, {slowms})),
+    # and reports recent slow operations and collection scans.
+    try:
+        profile_level = (await db.command({"profile": -1})).get("was", 0)
+        entries = await db["system.profile"].find(
+            {"$or": [{"millis": {"$gte": slow_ms}}, {"planSummary": "COLLSCAN"}]},
+            {"op": 1, "ns": 1, "millis": 1, "planSummary": 1, "docsExamined": 1, "keysExamined": 1, "nreturned": 1, "ts": 1}
+        ).sort("ts", -1).limit(limit).to_list(limit)
+    except OperationFailure as e:
+        return {"profilingLevel": None, "error": str(e), "operations": []}
+
+    for entry in entries:
+        entry.pop("_id", None)
+    return {"profilingLevel": profile_level, "operations": entries}
+
+@router.get("/render-cache")
+async def get_render_cache_stats():
+    # Whole cache, across tenants: lookups, size and evictions.
+    return await asyncio.to_thread(render_cache.stats)
@@ -1,39 +1,151 @@
-from fastapi import APIRouter, HTTPException, Request, Form, UploadFile, File, Body
+import asyncio
+from fastapi import APIRouter, HTTPException, Request, Response, Form, UploadFile, File, Body, Query
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import List, Optional
+from datetime import datetime
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError, WriteError
 from app.config.db import db
-from app.models.document import DocumentModel, DocumentCreate, DocumentUpdate, DocumentUploadRequest
+from app.models.document import (
+    DocumentModel, DocumentCreate, DocumentUpdate, DocumentUploadRequest,
+    DocumentSummaryPage, SUMMARY_FIELDS, DocumentPatch, DocumentPatchResult,
+    ElementOverlap, DocumentRelayout, DocumentGenerateRequest, TemplateRecipient, MAX_GENERATE_SIZE, SignRequest,
+)
+from app.models.render_job import RenderJobModel
+from app.models.common import BulkCreateResult, MAX_BULK_SIZE
+from app.services.pdf_renderer import RenderError, resolve_upload_path, count_pages, placeholder_page_fields
+from app.services.render_jobs import render_queue
+from app.services.render_cache import render_cache
+from app.services.pdf_flatten import get_flattened_pdf, remove_flattened
+from app.services.signing import sign_document, clean_signers, update_pipeline, STATE_FIELDS
+from app.services.templating import CompiledTemplate, compiled_templates
+from app.services.geometry import ElementFrame, GridIndex, GeometryError, placed_elements, MAX_COORDINATE
+from app.services.pagination import MAX_PAGE_SIZE, fetch_page, parse_fields, build_projection
+from app.services.stats import record_document_change, record_document_inserts, refresh_stats
+from app.services.element_patch import PatchError, build_update, check_elements
+from app.services.blob_store import BlobError, inline_document, offload_document, offload_element
+from app.services.serialization import ResponseShape
+from app.services.http_cache import etag_matches
+from app.services.ndjson import NDJSON_MEDIA_TYPE, export_ndjson, import_ndjson, model_loader
+from app.services.instrumentation import InstrumentedRoute
 import json
 
-router = APIRouter(prefix="/api/documents", tags=["documents"])
+router = APIRouter(prefix="/api/documents", tags=["documents"], route_class=InstrumentedRoute)
+
+document_shape = ResponseShape(DocumentModel)
+
+def revision_filter(revision: int):
+    # Documents written before revisions existed have no field; treat them as revision 0.
+    return {"$in": [0, None]} if revision == 0 else revision
+
+async def revision_conflict(id: str, business_id: str) -> HTTPException:
+    current = await db.documents.find_one({"_id": ObjectId(id), "business_id": business_id}, {"revision": 1})
+    if not current:
+        return HTTPException(status_code=404, detail="Document not found")
+    return HTTPException(status_code=409, detail={"message": "Document was modified", "revision": current.get("revision", 0)})
 
 @router.get("", response_model=List[DocumentModel], response_model_by_alias=True)
-async def get_documents(business_id: str):
+async def get_documents(
+    business_id: str,
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
     if not business_id:
         raise HTTPException(status_code=400, detail="business_id is required")
     
-    documents = await db.documents.find({"business_id": business_id}).to_list(1000)
-    return documents
+    # Newest first. When more documents exist the next page starts at X-Next-Cursor.
+    try:
+        documents, next_cursor = await fetch_page(db.documents, {"business_id": business_id}, limit, cursor, document_shape.projection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # Encoded without response validation. Elements are validated on every
+    # write (create, update, element patches, import, relayout, generate), but
+    # documents written before that (or by hand) are returned as stored, with
+    # missing fields defaulted.
+    return document_shape.response(documents, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
+
+@router.get("/summary", response_model=DocumentSummaryPage, response_model_by_alias=True, response_model_exclude_unset=True)
+async def get_document_summaries(
+    business_id: str,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # Projection happens in MongoDB, so pages/canvasElements never leave the server.
+    try:
+        projection = build_projection(parse_fields(fields, DocumentModel.model_fields) or SUMMARY_FIELDS)
+        documents, next_cursor = await fetch_page(db.documents, {"business_id": business_id}, limit, cursor, projection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": documents, "nextCursor": next_cursor}
+
+@router.get("/export")
+async def export_documents(business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # Blob references are exported as inline data URLs, which import stores again.
+    return StreamingResponse(
+        export_ndjson(db.documents, {"business_id": business_id}, inline_document),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="documents-{business_id}.ndjson"'}
+    )
+
+@router.post("/import")
+async def import_documents(business_id: str, request: Request):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # Lines with an _id replace that document (scoped to business_id), others are inserted.
+    result = await import_ndjson(request.stream(), db.documents, business_id, model_loader(DocumentModel, business_id, offload_document))
+    await refresh_stats(business_id)
+    return result
+
+@router.get("/render-cache/stats")
+async def get_render_cache_stats(business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # Only this business's lookups; the shared cache is under /api/diagnostics/render-cache.
+    return render_cache.tenant_stats(business_id)
+
+def document_etag(document: dict) -> str:
+    # Edits and signatures bump `revision`; rendering only fills in pages and moves `renderProgress`.
+    return f'"{document["_id"]}-{document.get("revision", 0)}-{document.get("renderProgress", 0)}"'
 
 @router.get("/{id}", response_model=DocumentModel, response_model_by_alias=True)
-async def get_document_by_id(id: str, business_id: str):
+async def get_document_by_id(id: str, business_id: str, request: Request):
     if not business_id:
         raise HTTPException(status_code=400, detail="business_id is required")
     
     if not ObjectId.is_valid(id):
         raise HTTPException(status_code=400, detail="Invalid ID format")
 
-    document = await db.documents.find_one({"_id": ObjectId(id), "business_id": business_id})
+    query = {"_id": ObjectId(id), "business_id": business_id}
+    # Clients revalidate on every open/poll, so only fetch the version fields
+    # first and answer 304 without loading or encoding the document.
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        current = await db.documents.find_one(query, {"revision": 1, "renderProgress": 1})
+        if not current:
+            raise HTTPException(status_code=404, detail="Document not found")
+        etag = document_etag(current)
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    document = await db.documents.find_one(query, document_shape.projection)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    return document
+    return document_shape.response(document, headers={"ETag": document_etag(document), "Cache-Control": "no-cache"})
 
-@router.post("", response_model=DocumentModel, status_code=201, response_model_by_alias=True)
-async def create_document(document: DocumentCreate, business_id: str):
-    if not business_id:
-        raise HTTPException(status_code=400, detail="business_id is required")
-    
+async def prepare_document(document: DocumentCreate, business_id: str) -> dict:
     doc_dict = document.model_dump(by_alias=True, exclude_none=True)
     
     # Ensure business_id is set from query if not in body (though model requires it)
@@ -44,11 +156,127 @@ async def create_document(document: DocumentCreate, business_id: str):
         doc_dict['business_id'] = business_id
         
     doc_dict['status'] = 'draft' # Default
+    # Signing state is only ever written by the signing workflow.
+    doc_dict['signers'] = clean_signers(doc_dict.get('signers'))
+    doc_dict['pendingSigners'] = []
+    try:
+        await offload_document(doc_dict)
+    except BlobError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if 'date' not in doc_dict:
+        doc_dict['date'] = datetime.now()
     # Add other defaults if needed, but Pydantic handles defaults.
+    return doc_dict
+
+@router.post("", response_model=DocumentModel, status_code=201, response_model_by_alias=True)
+async def create_document(document: DocumentCreate, business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
     
-    new_doc = await db.documents.insert_one(doc_dict)
-    created_doc = await db.documents.find_one({"_id": new_doc.inserted_id})
-    return created_doc
+    doc_dict = await prepare_document(document, business_id)
+    # insert_one adds the generated _id to doc_dict, which is then the stored document.
+    await db.documents.insert_one(doc_dict)
+    await record_document_change(business_id, None, doc_dict)
+    return doc_dict
+
+@router.post("/bulk", response_model=BulkCreateResult, status_code=201, response_model_exclude_none=True)
+async def create_documents_bulk(documents: List[DocumentCreate], business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not documents or len(documents) > MAX_BULK_SIZE:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {MAX_BULK_SIZE} documents")
+
+    docs = [await prepare_document(document, business_id) for document in documents]
+    result = await db.documents.insert_many(docs)
+    await record_document_inserts(business_id, docs)
+    return {"insertedCount": len(result.inserted_ids), "ids": result.inserted_ids}
+
+def render_recipients(template: CompiledTemplate, recipients: List[TemplateRecipient]) -> List[dict]:
+    # One new draft document per recipient.
+    defaults = {v["name"]: v["value"] for v in template.document.get("variables") or []}
+    docs = []
+    for recipient in recipients:
+        values = {**defaults, **recipient.variables}
+        doc = template.render(values)
+        doc.update({
+            "status": "draft",
+            "date": datetime.now(),
+            "progress": 0,
+            "pendingSigners": [],
+            "revision": 0,
+            "variables": [{**v, "value": values[v["name"]]} for v in template.document.get("variables") or []]
+                + [{"name": name, "value": value} for name, value in recipient.variables.items() if name not in defaults],
+        })
+        if recipient.name:
+            doc["name"] = recipient.name
+        if recipient.signers is not None:
+            doc["signers"] = clean_signers([signer.model_dump(exclude_none=True) for signer in recipient.signers])
+        else:
+            doc["signers"] = clean_signers(template.document.get("signers"))
+        if recipient.dueDate is not None:
+            doc["dueDate"] = recipient.dueDate
+        docs.append(doc)
+    return docs
+
+@router.post("/{id}/generate", response_model=BulkCreateResult, status_code=201, response_model_exclude_none=True)
+async def generate_documents(id: str, business_id: str, request: DocumentGenerateRequest, response: Response):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    if not request.recipients or len(request.recipients) > MAX_GENERATE_SIZE:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {MAX_GENERATE_SIZE} recipients")
+
+    query = {"_id": ObjectId(id), "business_id": business_id}
+    current = await db.documents.find_one(query, {"revision": 1})
+    if not current:
+        raise HTTPException(status_code=404, detail="Document not found")
+    revision = current.get("revision", 0)
+
+    async def load():
+        document = await db.documents.find_one({**query, "revision": revision_filter(revision)}, {"_id": 0})
+        if not document:
+            return None
+        # Rendering only substitutes text, so valid template elements stay valid.
+        check_elements(document)
+        return CompiledTemplate(document)
+
+    # The template is parsed once per revision, not per request or recipient.
+    try:
+        template = await compiled_templates.get_or_load(f"{id}:{revision}", load)
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=f"Template cannot be generated from: {e}")
+    if template is None:
+        raise await revision_conflict(id, business_id)
+
+    ids = []
+    for start in range(0, len(request.recipients), MAX_BULK_SIZE):
+        # Rendered off the event loop, one batch at a time.
+        docs = await asyncio.to_thread(render_recipients, template, request.recipients[start:start + MAX_BULK_SIZE])
+        try:
+            result = await db.documents.insert_many(docs)
+            inserted = result.inserted_ids
+        except PyMongoError as e:
+            # Earlier batches stay created; report them with the error instead
+            # of failing the whole request. insert_many is ordered, so with a
+            # BulkWriteError the first nInserted documents of the batch exist.
+            inserted, message = [], str(e)
+            if isinstance(e, BulkWriteError):
+                inserted = [doc["_id"] for doc in docs[:e.details.get("nInserted", 0)]]
+                message = next((error.get("errmsg") for error in e.details.get("writeErrors", [])), message)
+            await record_document_inserts(business_id, docs[:len(inserted)])
+            ids.extend(inserted)
+            if not ids:
+                raise HTTPException(status_code=500, detail=f"Failed to create documents: {message}")
+            response.status_code = 207
+            return {"insertedCount": len(ids), "ids": ids, "error": f"Stopped after {len(ids)} of {len(request.recipients)} documents: {message}"}
+        await record_document_inserts(business_id, docs)
+        ids.extend(inserted)
+
+    return {"insertedCount": len(ids), "ids": ids}
 
 @router.put("/{id}", response_model=DocumentModel)
 async def update_document(id: str, business_id: str, document: DocumentUpdate):
@@ -59,22 +287,225 @@ async def update_document(id: str, business_id: str, document: DocumentUpdate):
         raise HTTPException(status_code=400, detail="Invalid ID format")
         
     update_data = document.model_dump(exclude_unset=True)
-    
-    if not update_data:
-         # Just return existing?
-         pass
+    expected_revision = update_data.pop("revision", None)
+    try:
+        await offload_document(update_data)
+    except BlobError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    query = {"_id": ObjectId(id), "business_id": business_id}
+    if expected_revision is not None:
+        query["revision"] = revision_filter(expected_revision)
+
+    signing = bool(update_data.keys() & {"signers", "signingOrder", "status"})
+    if signing:
+        # Signer status/signedAt are kept from the stored document and the
+        # signing state is recomputed in the same write.
+        update_ops = update_pipeline(update_data)
+    else:
+        update_ops = {"$inc": {"revision": 1}}
+        if update_data:
+            update_ops["$set"] = update_data
 
     # Node logic: matches { _id, business_id }
     result = await db.documents.find_one_and_update(
-        {"_id": ObjectId(id), "business_id": business_id},
-        {"$set": update_data},
-        return_document=True
+        query,
+        update_ops,
+        return_document=ReturnDocument.BEFORE
     )
     
     if not result:
+        if expected_revision is not None:
+            raise await revision_conflict(id, business_id)
         raise HTTPException(status_code=404, detail="Document not found")
-        
-    return result
+
+    # The stats counters need the previous status; the response is the previous
+    # document with the same top-level $set applied.
+    updated = {**result, **update_data, "revision": result.get("revision", 0) + 1}
+    if signing:
+        state = await db.documents.find_one({"_id": ObjectId(id), "business_id": business_id}, STATE_FIELDS)
+        if state:
+            updated.update(state)
+    await record_document_change(business_id, result, updated)
+    return updated
+
+@router.patch("/{id}/elements", response_model=DocumentPatchResult, response_model_by_alias=True)
+async def patch_document_elements(id: str, business_id: str, patch: DocumentPatch):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    query = {"_id": ObjectId(id), "business_id": business_id, "revision": revision_filter(patch.revision)}
+    # Replacements are validated against the stored elements they change.
+    document = await db.documents.find_one(query, {"canvasElements": 1, "pages.layout": 1})
+    if not document:
+        raise await revision_conflict(id, business_id)
+
+    try:
+        for operation in patch.operations:
+            if operation.value:
+                await offload_element(operation.value)
+        built = build_update(patch.operations, document)
+    except (PatchError, BlobError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if built is None:
+        return {"_id": id, "revision": patch.revision}
+
+    # One update guarded by the revision the patch was validated against; if
+    # another writer got in first nothing is applied and the client reloads.
+    update, array_filters = built
+    update["$inc"] = {"revision": 1}
+    try:
+        result = await db.documents.update_one(query, update, array_filters=array_filters or None)
+    except WriteError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not result.matched_count:
+        raise await revision_conflict(id, business_id)
+
+    return {"_id": id, "revision": patch.revision + 1}
+
+async def load_elements(id: str, business_id: str, fields: Optional[dict] = None) -> dict:
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    document = await db.documents.find_one(
+        {"_id": ObjectId(id), "business_id": business_id},
+        {"canvasElements": 1, **(fields or {})}
+    )
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return document
+
+@router.get("/{id}/elements/region")
+async def get_elements_in_region(
+    id: str,
+    business_id: str,
+    page: int = Query(ge=1),
+    x: float = Query(0, ge=-MAX_COORDINATE, le=MAX_COORDINATE),
+    y: float = Query(0, ge=-MAX_COORDINATE, le=MAX_COORDINATE),
+    width: float = Query(gt=0, le=2 * MAX_COORDINATE),
+    height: float = Query(gt=0, le=2 * MAX_COORDINATE),
+    contained: bool = False
+):
+    document = await load_elements(id, business_id)
+    elements = placed_elements(document.get("canvasElements"))
+    index = GridIndex(ElementFrame.from_elements(elements))
+    return [elements[i] for i in sorted(index.query(page, x, y, width, height, contained=contained))]
+
+@router.get("/{id}/elements/overlaps", response_model=List[ElementOverlap])
+async def get_element_overlaps(id: str, business_id: str, page: Optional[int] = Query(default=None, ge=1)):
+    document = await load_elements(id, business_id)
+    return GridIndex(ElementFrame.from_elements(document.get("canvasElements"))).overlaps(page)
+
+@router.post("/{id}/elements/relayout", response_model=DocumentPatchResult, response_model_by_alias=True)
+async def relayout_document_elements(id: str, business_id: str, relayout: DocumentRelayout):
+    document = await load_elements(id, business_id, {"pageDimensions": 1, "revision": 1})
+    if document.get("revision", 0) != relayout.revision:
+        raise await revision_conflict(id, business_id)
+
+    current = document.get("pageDimensions") or {}
+    if relayout.pageDimensions is not None:
+        target = {**current, **relayout.pageDimensions}
+    elif relayout.fromDpi and relayout.toDpi:
+        factor = relayout.toDpi / relayout.fromDpi
+        target = {page: {"width": dims["width"] * factor, "height": dims["height"] * factor} for page, dims in current.items()}
+    else:
+        raise HTTPException(status_code=422, detail="pageDimensions or fromDpi and toDpi are required")
+
+    elements = document.get("canvasElements") or []
+    try:
+        frame = ElementFrame.from_elements(elements).rescale(current, target)
+    except GeometryError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    elements = frame.apply(elements)
+    try:
+        check_elements({"canvasElements": elements})
+    except PatchError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # One write for the whole canvas, guarded by the revision it was computed from.
+    result = await db.documents.update_one(
+        {"_id": ObjectId(id), "business_id": business_id, "revision": revision_filter(relayout.revision)},
+        {"$set": {"canvasElements": elements, "pageDimensions": target}, "$inc": {"revision": 1}}
+    )
+    if not result.matched_count:
+        raise await revision_conflict(id, business_id)
+
+    return {"_id": id, "revision": relayout.revision + 1}
+
+@router.post("/{id}/sign", response_model=DocumentModel, response_model_by_alias=True)
+async def submit_signature(id: str, business_id: str, request: SignRequest):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    document = await sign_document({"_id": ObjectId(id), "business_id": business_id}, request.email, document_shape.projection)
+    if not document:
+        if not await db.documents.find_one({"_id": ObjectId(id), "business_id": business_id}, {"_id": 1}):
+            raise HTTPException(status_code=404, detail="Document not found")
+        raise HTTPException(status_code=409, detail="Document is not awaiting a signature from this signer")
+
+    if document.get("status") == "completed":
+        await record_document_change(business_id, {"status": "waiting"}, {"status": "completed"})
+
+    return document_shape.response(document)
+
+@router.get("/{id}/render-status", response_model=RenderJobModel, response_model_by_alias=True)
+async def get_render_status(id: str, business_id: str):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    job = await db.renderjobs.find_one({"_id": ObjectId(id), "business_id": business_id})
+    if not job:
+        raise HTTPException(status_code=404, detail="Render job not found")
+
+    return job
+
+@router.get("/{id}/flatten")
+async def flatten_document(id: str, business_id: str, request: Request):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    if not ObjectId.is_valid(id):
+        raise HTTPException(status_code=400, detail="Invalid ID format")
+
+    document = await db.documents.find_one(
+        {"_id": ObjectId(id), "business_id": business_id},
+        {"name": 1, "uploadPath": 1, "revision": 1, "canvasElements": 1, "pageDimensions": 1}
+    )
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if not document.get("uploadPath"):
+        raise HTTPException(status_code=422, detail="Document has no uploaded PDF")
+
+    revision = document.get("revision", 0)
+    etag = f'"{id}-{revision}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    try:
+        path = await get_flattened_pdf(document, resolve_upload_path(document["uploadPath"]))
+    except RenderError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    file_name = f"{document.get('name') or id}.pdf"
+    return FileResponse(
+        path,
+        media_type="application/pdf",
+        filename=file_name,
+        headers={"ETag": etag, "Cache-Control": "no-cache"},
+    )
 
 @router.delete("/{id}")
 async def delete_document(id: str, business_id: str):
@@ -88,6 +519,9 @@ async def delete_document(id: str, business_id: str):
     
     if not result:
         raise HTTPException(status_code=404, detail="Document not found")
+
+    await record_document_change(business_id, result, None)
+    await asyncio.to_thread(remove_flattened, id)
         
     return {"message": "Document deleted successfully"}
 
@@ -99,17 +533,29 @@ async def upload_document_pdf(
     if not business_id:
         raise HTTPException(status_code=400, detail="business_id is required")
     
+    try:
+        pdf_path = resolve_upload_path(payload.uploadPath)
+        total_pages = await count_pages(pdf_path)
+    except RenderError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    # The document is stored with placeholder pages and rendered by the
+    # background job queue; the editor polls render-status (or the document
+    # itself) and shows pages as they land.
     new_doc_data = {
         "name": payload.documentName,
         "uploadPath": payload.uploadPath,
         "documentType": "upload-existing",
-        "signers": payload.signers,
+        "signers": clean_signers([s.model_dump() for s in payload.signers or []]),
         "status": "draft",
+        "date": datetime.now(),
         "business_id": business_id,
-        "totalPages": 0, # Default
-        "pages": []
+        **placeholder_page_fields(total_pages),
     }
     
     new_doc = await db.documents.insert_one(new_doc_data)
-    created_doc = await db.documents.find_one({"_id": new_doc.inserted_id})
-    return created_doc
+    await record_document_change(business_id, None, new_doc_data)
+    await render_queue.enqueue(new_doc.inserted_id, business_id, pdf_path, total_pages)
+
+    # Rendered pages show up through render-status; the response is the document as inserted.
+    return new_doc_data
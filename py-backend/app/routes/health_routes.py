@@ -0,0 +1,28 @@
+import asyncio
+import time
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from pymongo.errors import PyMongoError
+from app.config.db import db, pool_monitor
+from app.services.instrumentation import InstrumentedRoute
+
+router = APIRouter(prefix="/health", tags=["health"], route_class=InstrumentedRoute)
+
+# How long the readiness ping may take before the instance is reported unready.
+PING_TIMEOUT = 2
+
+@router.get("/live")
+async def liveness():
+    return {"status": "ok"}
+
+@router.get("/ready")
+async def readiness():
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), PING_TIMEOUT)
+        database = {"ok": True, "latencyMs": round((time.perf_counter() - start) * 1000, 2)}
+    except (PyMongoError, asyncio.TimeoutError) as e:
+        database = {"ok": False, "error": str(e) or type(e).__name__}
+
+    body = {"status": "ready" if database["ok"] else "unavailable", "database": database, "pool": pool_monitor.stats()}
+    return JSONResponse(body, status_code=200 if database["ok"] else 503)
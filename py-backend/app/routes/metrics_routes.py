@@ -0,0 +1,31 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.config.db import pool_monitor
+from app.config.metrics import METRICS_PATH
+from app.services.metrics import registry, Gauge
+from app.services.render_jobs import render_queue
+from app.services.render_cache import render_cache
+from app.services.settings_cache import settings_cache
+
+router = APIRouter(tags=["metrics"])
+
+# Point-in-time values read from their owners on every scrape.
+registry.register(Gauge(
+    "render_queue_depth", "Render jobs waiting in this process's queue.",
+    collect=lambda: {(): render_queue.queue.qsize()}))
+registry.register(Gauge(
+    "mongodb_pool_checked_out", "Connections checked out of the pool, per server.", ("server",),
+    collect=lambda: {(server,): pool["checkedOut"] for server, pool in pool_monitor.stats()["servers"].items()}))
+registry.register(Gauge(
+    "mongodb_pool_waiting", "Operations waiting for a pooled connection, per server.", ("server",),
+    collect=lambda: {(server,): pool["waiting"] for server, pool in pool_monitor.stats()["servers"].items()}))
+registry.register(Gauge(
+    "cache_lookups_total", "Lookups served by the in-process caches since start.", ("cache", "result"), kind="counter",
+    collect=lambda: {
+        ("render", "hit"): render_cache.hits, ("render", "miss"): render_cache.misses,
+        ("settings", "hit"): settings_cache.hits, ("settings", "miss"): settings_cache.misses,
+    }))
+
+@router.get(METRICS_PATH, include_in_schema=False)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,24 +1,33 @@
 from fastapi import APIRouter, HTTPException
 from app.config.db import db
 from app.models.settings import SettingsModel, SettingsUpdate
+from app.services.blob_store import BlobError, offload_branding
+from app.services.settings_cache import settings_cache
+from app.services.instrumentation import InstrumentedRoute
 
-router = APIRouter(prefix="/api/settings", tags=["settings"])
+router = APIRouter(prefix="/api/settings", tags=["settings"], route_class=InstrumentedRoute)
+
+async def load_settings(business_id: str) -> dict:
+    # Create defaults on first read, in the same round trip as the lookup.
+    new_settings = SettingsModel(business_id=business_id)
+    settings_dict = new_settings.model_dump(by_alias=True, exclude=["id", "business_id"])
+    return await db.settings.find_one_and_update(
+        {"business_id": business_id},
+        {"$setOnInsert": settings_dict},
+        upsert=True,
+        return_document=True
+    )
+
+@router.get("/cache/stats")
+async def get_settings_cache_stats():
+    return settings_cache.stats()
 
 @router.get("", response_model=SettingsModel)
 async def get_settings(business_id: str):
     if not business_id:
         raise HTTPException(status_code=400, detail="business_id is required")
         
-    settings = await db.settings.find_one({"business_id": business_id})
-    
-    if not settings:
-        # Create default
-        new_settings = SettingsModel(business_id=business_id)
-        settings_dict = new_settings.model_dump(by_alias=True, exclude=["id"])
-        res = await db.settings.insert_one(settings_dict)
-        settings = await db.settings.find_one({"_id": res.inserted_id})
-        
-    return settings
+    return await settings_cache.get_or_load(business_id, lambda: load_settings(business_id))
 
 @router.put("", response_model=SettingsModel)
 async def update_settings(business_id: str, settings: SettingsUpdate):
@@ -27,6 +36,10 @@ async def update_settings(business_id: str, settings: SettingsUpdate):
     
     # Using updates directly
     update_data = settings.model_dump(exclude_unset=True)
+    try:
+        await offload_branding(update_data.get("branding"))
+    except BlobError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
     # Using find_one_and_update with upsert logic as per node controller
     # Node: findOneAndUpdate({business_id}, {...req.body, business_id}, {new: true, upsert: true, setDefaultsOnInsert: true})
@@ -45,5 +58,6 @@ async def update_settings(business_id: str, settings: SettingsUpdate):
         return_document=True
     )
     # If upserted, it returns the doc.
+    settings_cache.set(business_id, result)
     
     return result
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+from app.config.db import db
+from app.models.document import DocumentSummaryPage, SUMMARY_FIELDS
+from app.services.pagination import MAX_PAGE_SIZE, fetch_page, build_projection
+from app.services.signing import normalize_email
+from app.services.instrumentation import InstrumentedRoute
+
+router = APIRouter(prefix="/api/signers", tags=["signers"], route_class=InstrumentedRoute)
+
+@router.get("/{email}/pending", response_model=DocumentSummaryPage, response_model_by_alias=True, response_model_exclude_unset=True)
+async def get_pending_documents(
+    email: str,
+    business_id: str,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+):
+    if not business_id:
+        raise HTTPException(status_code=400, detail="business_id is required")
+
+    # Documents waiting on this signer right now, newest first, read off the
+    # pendingSigners multikey index.
+    try:
+        documents, next_cursor = await fetch_page(
+            db.documents,
+            {"pendingSigners": normalize_email(email), "business_id": business_id},
+            limit,
+            cursor,
+            build_projection(SUMMARY_FIELDS)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {"items": documents, "nextCursor": next_cursor}
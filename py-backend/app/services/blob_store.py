@@ -0,0 +1,226 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Optional, Dict, Any, AsyncIterator, List
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+from gridfs.errors import NoFile
+from app.config.db import get_database
+from app.config.blobs import BLOB_BACKEND, BLOB_DIR, BLOB_BUCKET, BLOB_CONTENT_TYPES, MAX_BLOB_BYTES
+
+# Blobs are addressed by the SHA-256 of their bytes, so storing the same image
+# twice (a signature reused across documents, a logo saved again) is a no-op.
+
+CHUNK_SIZE = 256 * 1024
+HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+DATA_URL_PATTERN = re.compile(r"^data:(?P<type>[\w.+-]+/[\w.+-]+)?(?P<params>(;[\w-]+=[^;,]*)*);base64,(?P<data>.*)$", re.DOTALL)
+
+class BlobError(ValueError):
+    pass
+
+def is_blob_hash(value: str) -> bool:
+    return bool(HASH_PATTERN.match(value or ""))
+
+def sniff_content_type(data: bytes) -> Optional[str]:
+    # Image type from the file signature; None for anything else.
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+def check_image(data: bytes, declared_type: Optional[str]) -> str:
+    # The content type to store: an allowed image type that the bytes agree with.
+    if len(data) > MAX_BLOB_BYTES:
+        raise BlobError(f"Blob is larger than {MAX_BLOB_BYTES} bytes")
+    declared = (declared_type or "").split(";")[0].strip().lower()
+    if declared not in BLOB_CONTENT_TYPES:
+        raise BlobError(f"Unsupported content type {declared or 'none'}; allowed: {', '.join(BLOB_CONTENT_TYPES)}")
+    if sniff_content_type(data) != declared:
+        raise BlobError(f"Content is not a valid {declared} image")
+    return declared
+
+class LocalBlobStore:
+    # <root>/<aa>/<hash> holds the bytes and <hash>.json the content type and length.
+
+    def __init__(self, root: str = BLOB_DIR):
+        self.root = root
+
+    def _path(self, blob_hash: str) -> str:
+        return os.path.join(self.root, blob_hash[:2], blob_hash)
+
+    def _write(self, blob_hash: str, data: bytes, content_type: str):
+        path = self._path(blob_hash)
+        if os.path.exists(path + ".json"):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        for suffix, payload in (("", data), (".json", json.dumps({"contentType": content_type, "length": len(data)}).encode())):
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path + suffix)
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        blob_hash = hashlib.sha256(data).hexdigest()
+        await asyncio.to_thread(self._write, blob_hash, data, content_type)
+        return blob_hash
+
+    async def delete(self, blob_hash: str):
+        # Metadata first: a blob without it no longer exists for info() and put().
+        for suffix in (".json", ""):
+            try:
+                await asyncio.to_thread(os.remove, self._path(blob_hash) + suffix)
+            except FileNotFoundError:
+                pass
+
+    async def info(self, blob_hash: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(blob_hash) + ".json") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    async def stream(self, blob_hash: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        # Yields bytes [start, end] (inclusive), like an HTTP byte range.
+        f = await asyncio.to_thread(open, self._path(blob_hash), "rb")
+        try:
+            f.seek(start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                chunk = await asyncio.to_thread(f.read, CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            f.close()
+
+class GridFSBlobStore:
+    # Stores each blob as a GridFS file named by its hash.
+
+    def __init__(self, database, bucket_name: str = BLOB_BUCKET):
+        self.files = database[f"{bucket_name}.files"]
+        self.bucket = AsyncIOMotorGridFSBucket(database, bucket_name=bucket_name)
+
+    async def put(self, data: bytes, content_type: str) -> str:
+        blob_hash = hashlib.sha256(data).hexdigest()
+        if not await self.files.find_one({"filename": blob_hash}, {"_id": 1}):
+            await self.bucket.upload_from_stream(blob_hash, data, chunk_size_bytes=CHUNK_SIZE, metadata={"contentType": content_type})
+        return blob_hash
+
+    async def delete(self, blob_hash: str):
+        async for file in self.files.find({"filename": blob_hash}, {"_id": 1}):
+            try:
+                await self.bucket.delete(file["_id"])
+            except NoFile:
+                pass
+
+    async def info(self, blob_hash: str) -> Optional[Dict[str, Any]]:
+        file = await self.files.find_one({"filename": blob_hash}, {"length": 1, "metadata": 1})
+        if not file:
+            return None
+        return {"contentType": (file.get("metadata") or {}).get("contentType"), "length": file["length"]}
+
+    async def stream(self, blob_hash: str, start: int = 0, end: Optional[int] = None) -> AsyncIterator[bytes]:
+        try:
+            grid_out = await self.bucket.open_download_stream_by_name(blob_hash)
+        except NoFile:
+            return
+        grid_out.seek(start)
+        remaining = (grid_out.length if end is None else end + 1) - start
+        while remaining > 0:
+            chunk = await grid_out.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+_store = None
+
+def get_blob_store():
+    global _store
+    if _store is None:
+        _store = GridFSBlobStore(get_database()) if BLOB_BACKEND == "gridfs" else LocalBlobStore()
+    return _store
+
+async def read_blob(blob_hash: str) -> bytes:
+    return b"".join([chunk async for chunk in get_blob_store().stream(blob_hash)])
+
+def parse_data_url(value: str):
+    match = DATA_URL_PATTERN.match(value or "")
+    if not match:
+        return None
+    try:
+        data = base64.b64decode(match.group("data"), validate=False)
+    except (binascii.Error, ValueError):
+        raise BlobError("Invalid base64 data")
+    return data, match.group("type") or "application/octet-stream"
+
+async def offload_data_url(value: Optional[str]) -> Optional[str]:
+    # Stores a base64 data URL and returns its hash; None if it is not a data URL.
+    parsed = parse_data_url(value) if isinstance(value, str) else None
+    if not parsed:
+        return None
+    data, content_type = parsed
+    return await get_blob_store().put(data, check_image(data, content_type))
+
+# Element types whose imageData is moved into the blob store.
+IMAGE_ELEMENT_TYPES = {"signature", "image"}
+
+async def offload_element(element: Dict[str, Any]) -> Dict[str, Any]:
+    # Replaces an inline imageData data URL with an imageBlob reference, in place.
+    if element.get("type") in IMAGE_ELEMENT_TYPES or "type" not in element:
+        blob_hash = await offload_data_url(element.get("imageData"))
+        if blob_hash:
+            element["imageBlob"] = blob_hash
+            element["imageData"] = None
+    return element
+
+async def offload_elements(elements: Optional[List[Dict[str, Any]]]):
+    for element in elements or []:
+        await offload_element(element)
+
+async def offload_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Works on full documents and on partial update payloads alike.
+    await offload_elements(doc.get("canvasElements"))
+    for page in doc.get("pages") or []:
+        await offload_elements(page.get("layout"))
+    return doc
+
+async def inline_element(element: Dict[str, Any]) -> Dict[str, Any]:
+    # The reverse of offload_element: the referenced bytes back as an imageData
+    # data URL, in place. A blob that no longer exists keeps its reference.
+    blob_hash = element.get("imageBlob")
+    if not is_blob_hash(blob_hash or ""):
+        return element
+    info = await get_blob_store().info(blob_hash)
+    if info is None:
+        return element
+    data = await read_blob(blob_hash)
+    element["imageData"] = f"data:{info.get('contentType') or 'application/octet-stream'};base64,{base64.b64encode(data).decode()}"
+    element.pop("imageBlob", None)
+    return element
+
+async def inline_document(doc: Dict[str, Any]) -> Dict[str, Any]:
+    # Makes a stored document self-contained, e.g. for export to another deployment.
+    for element in doc.get("canvasElements") or []:
+        await inline_element(element)
+    for page in doc.get("pages") or []:
+        for element in page.get("layout") or []:
+            await inline_element(element)
+    return doc
+
+async def offload_branding(branding: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if branding:
+        blob_hash = await offload_data_url(branding.get("logo"))
+        if blob_hash:
+            branding["logoBlob"] = blob_hash
+            branding["logo"] = None
+    return branding
@@ -0,0 +1,104 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+class TTLCache:
+    # LRU map with per-entry expiry. Concurrent misses for the same key share
+    # one load, so a cold key costs a single query however many requests ask.
+    # A load only caches its result if the key was not set or invalidated
+    # while it ran; otherwise it could overwrite a newer value with what it read.
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Future] = {}
+        # Generation of each key with a load in flight, bumped by set/invalidate/clear.
+        self._generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _bump(self, key: str):
+        if key in self._generations:
+            self._generations[key] += 1
+
+    def set(self, key: str, value: Any):
+        self._bump(key)
+        self._store(key, value)
+
+    def _store(self, key: str, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: str):
+        self._bump(key)
+        if self._entries.pop(key, None) is not None:
+            self.invalidations += 1
+
+    def clear(self):
+        for key in self._generations:
+            self._bump(key)
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        if key in self._loading:
+            return await asyncio.shield(self._loading[key])
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        self._generations[key] = generation = 0
+        try:
+            value = await load()
+            if value is not None and self._generations[key] == generation:
+                self._store(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged as unhandled.
+            future.exception()
+            raise
+        finally:
+            del self._loading[key]
+            del self._generations[key]
+            if not future.done():
+                future.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxEntries": self.max_entries,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRatio": self.hits / lookups if lookups else 0,
+            "expirations": self.expirations,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,157 @@
+import zlib
+from typing import List, Optional, Tuple
+from app.config.compression import COMPRESSION_MIN_SIZE, COMPRESSION_GZIP_LEVEL, COMPRESSION_BROTLI_QUALITY
+from app.services.http_cache import weaken_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "application/javascript", "application/xml", "image/svg+xml", "text/")
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    # Picks br or gzip from an Accept-Encoding header, honouring q=0 exclusions.
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip()] = q
+    for encoding in (("br",) if brotli else ()) + ("gzip",):
+        if accepted.get(encoding, accepted.get("*", 0)) > 0:
+            return encoding
+    return None
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type.startswith(COMPRESSIBLE_TYPES)
+
+class _Compressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._impl = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+            self.compress = self._impl.process
+            self.finish = self._impl.finish
+        else:
+            # wbits 16+ writes a gzip header and trailer.
+            self._impl = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+            self.compress = self._impl.compress
+            self.finish = self._impl.flush
+
+class CompressionMiddleware:
+    # ASGI middleware compressing text-like responses. Whole bodies below
+    # minimum_size are left alone; streamed bodies are compressed as they go.
+    # Partial (206), empty and already-encoded responses pass through.
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+        await _CompressingResponder(send, encoding, self.minimum_size).run(self.app, scope, receive)
+
+class _CompressingResponder:
+    def __init__(self, send, encoding: str, minimum_size: int):
+        self.send = send
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.start_message = None
+        # None until the first body message decides; then "passthrough" or "compress".
+        self.mode: Optional[str] = None
+        self.compressor: Optional[_Compressor] = None
+
+    async def run(self, app, scope, receive):
+        await app(scope, receive, self.on_send)
+
+    def _headers(self) -> List[Tuple[bytes, bytes]]:
+        return list(self.start_message.get("headers", []))
+
+    def _encoded_headers(self, content_length: Optional[int]) -> List[Tuple[bytes, bytes]]:
+        headers = []
+        vary = None
+        for name, value in self._headers():
+            if name == b"content-length":
+                continue
+            if name == b"vary":
+                vary = value
+                continue
+            if name == b"etag":
+                value = weaken_etag(value.decode("latin-1")).encode("latin-1")
+            headers.append((name, value))
+        if vary is None:
+            vary = b"Accept-Encoding"
+        elif b"accept-encoding" not in vary.lower():
+            vary += b", Accept-Encoding"
+        headers.append((b"vary", vary))
+        headers.append((b"content-encoding", self.encoding.encode()))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        return headers
+
+    def _should_compress(self) -> bool:
+        if self.start_message["status"] in (204, 206, 304) or self.start_message["status"] < 200:
+            return False
+        headers = {name: value for name, value in self._headers()}
+        if b"content-encoding" in headers:
+            return False
+        return is_compressible(headers.get(b"content-type", b"").decode("latin-1"))
+
+    async def on_send(self, message):
+        if message["type"] == "http.response.start":
+            self.start_message = message
+            if not self._should_compress():
+                self.mode = "passthrough"
+                if message["status"] == 304:
+                    # Carry the validator the compressed 200 would have had.
+                    message = {**message, "headers": [
+                        (name, weaken_etag(value.decode("latin-1")).encode("latin-1") if name == b"etag" else value)
+                        for name, value in self._headers()
+                    ]}
+                await self.send(message)
+            return
+
+        if message["type"] != "http.response.body" or self.mode == "passthrough":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode is None:
+            if not more_body and len(body) < self.minimum_size:
+                self.mode = "passthrough"
+                await self.send(self.start_message)
+                await self.send(message)
+                return
+            self.mode = "compress"
+            self.compressor = _Compressor(self.encoding)
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.finish()
+                await self.send({**self.start_message, "headers": self._encoded_headers(len(compressed))})
+                await self.send({"type": "http.response.body", "body": compressed})
+                return
+            # Streaming: the final length is unknown, so the response goes out chunked.
+            await self.send({**self.start_message, "headers": self._encoded_headers(None)})
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.finish()
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
@@ -0,0 +1,50 @@
+import asyncio
+import os
+from typing import List, Dict, Any, Callable, Awaitable, Optional
+from bson import ObjectId
+from app.config.db import db
+from app.config.render import RENDER_DIR
+from app.services.pdf_renderer import render_pdf, rendered_page_updates, build_profile
+from app.services.render_cache import render_cache, hash_file
+
+async def render_document_pages(
+    doc_id: ObjectId,
+    pdf_path: str,
+    total_pages: int,
+    on_progress: Optional[Callable[[int], Awaitable[None]]] = None,
+    profile: Optional[Dict[str, Any]] = None,
+    business_id: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    # Streams pages into an existing document created with placeholder_page_fields(),
+    # updating `renderProgress` (0-100) as each window lands. Identical PDFs are served
+    # from the render cache without rasterizing again.
+    document_id = str(doc_id)
+    output_dir = os.path.join(RENDER_DIR, document_id)
+    profile = profile or build_profile()
+
+    cache_key = render_cache.make_key(await asyncio.to_thread(hash_file, pdf_path), profile)
+    cached = await asyncio.to_thread(render_cache.lookup, cache_key, business_id)
+    if cached is not None:
+        await asyncio.to_thread(render_cache.materialize, cache_key, cached, output_dir)
+        updates = rendered_page_updates(document_id, cached)
+        updates["renderProgress"] = 100
+        await db.documents.update_one({"_id": doc_id}, {"$set": updates})
+        if on_progress:
+            await on_progress(100)
+        return cached
+
+    done = 0
+
+    async def on_pages(pages: List[Dict[str, Any]]):
+        nonlocal done
+        done += len(pages)
+        progress = int(done * 100 / total_pages) if total_pages else 100
+        updates = rendered_page_updates(document_id, pages)
+        updates["renderProgress"] = progress
+        await db.documents.update_one({"_id": doc_id}, {"$set": updates})
+        if on_progress:
+            await on_progress(progress)
+
+    rendered = await render_pdf(pdf_path, document_id, total_pages, on_pages=on_pages, profile=profile)
+    await asyncio.to_thread(render_cache.store, cache_key, rendered, output_dir, business_id)
+    return rendered
@@ -0,0 +1,193 @@
+from typing import List, Dict, Any, Tuple, Optional
+from pydantic import TypeAdapter, ValidationError
+from app.models.common import CanvasElement, ELEMENT_MODELS
+from app.models.document import ElementOperation
+
+# Translates element operations into positional MongoDB updates, so an edit to
+# one element writes only that element instead of the whole canvasElements /
+# pages arrays. Operations are validated against the stored elements.
+
+element_adapter = TypeAdapter(CanvasElement)
+
+# Fields a `replace` may touch: anything some element type defines, except its identity.
+ELEMENT_FIELDS = set().union(*(model.model_fields for model in ELEMENT_MODELS)) - {"id", "type"}
+MOVE_FIELDS = {"x", "y", "page"}
+
+class PatchError(ValueError):
+    pass
+
+def array_path(page: Optional[int]) -> str:
+    return "canvasElements" if page is None else f"pages.{page - 1}.layout"
+
+class UpdateBatch:
+    # Operations that can share one update command. MongoDB rejects updates
+    # where two operators touch the same array, so each array path may only be
+    # used by one kind of change (push, pull or set) per batch.
+
+    def __init__(self):
+        self.kinds: Dict[str, str] = {}
+        self.push: Dict[str, List[dict]] = {}
+        self.pull: Dict[str, List[str]] = {}
+        self.set: Dict[str, Any] = {}
+        self.identifiers: Dict[Tuple[str, str], str] = {}
+
+    def accepts(self, path: str, kind: str) -> bool:
+        return self.kinds.get(path, kind) == kind
+
+    def add_push(self, path: str, element: dict):
+        self.kinds[path] = "push"
+        self.push.setdefault(path, []).append(element)
+
+    def add_pull(self, path: str, element_id: str):
+        self.kinds[path] = "pull"
+        self.pull.setdefault(path, []).append(element_id)
+
+    def add_set(self, path: str, element_id: str, fields: Dict[str, Any]):
+        self.kinds[path] = "set"
+        # One array filter identifier per element, shared by all its fields.
+        identifier = self.identifiers.setdefault((path, element_id), f"e{len(self.identifiers)}")
+        for field, value in fields.items():
+            self.set[f"{path}.$[{identifier}].{field}"] = value
+
+    def to_update(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        update: Dict[str, Any] = {}
+        if self.push:
+            update["$push"] = {path: {"$each": elements} for path, elements in self.push.items()}
+        if self.pull:
+            update["$pull"] = {path: {"id": {"$in": ids}} for path, ids in self.pull.items()}
+        if self.set:
+            update["$set"] = self.set
+        array_filters = [{f"{identifier}.id": element_id} for (_, element_id), identifier in self.identifiers.items()]
+        return update, array_filters
+
+def validate_element(value: Optional[Dict[str, Any]]) -> dict:
+    try:
+        return element_adapter.validate_python(value or {}).model_dump(exclude_unset=True)
+    except ValidationError as e:
+        raise PatchError(f"Invalid element: {e.errors(include_url=False)}")
+
+def check_elements(document: Dict[str, Any]):
+    # For writes that rebuild whole arrays from stored elements (relayout,
+    # documents generated from a template): every element of canvasElements
+    # and of each page layout must be valid.
+    layouts = [document.get("canvasElements")] + [page.get("layout") for page in document.get("pages") or []]
+    for elements in layouts:
+        for element in elements or []:
+            try:
+                element_adapter.validate_python(element)
+            except ValidationError as e:
+                raise PatchError(f"Invalid element {element.get('id')}: {e.errors(include_url=False)}")
+
+MODELS_BY_TYPE = {model.model_fields["type"].annotation.__args__[0]: model for model in ELEMENT_MODELS}
+
+def validate_fields(current: Dict[str, Any], value: Optional[Dict[str, Any]], allowed: set) -> Dict[str, Any]:
+    # Field values are checked against the stored element's type: the change is
+    # merged into the element and the result validated as a whole.
+    if not value:
+        raise PatchError("value is required")
+    model = MODELS_BY_TYPE.get(current.get("type"))
+    unknown = set(value) - (allowed & set(model.model_fields) if model else allowed)
+    if unknown:
+        raise PatchError(f"Cannot update fields: {', '.join(sorted(unknown))}")
+    merged = validate_element({**current, **value})
+    return {field: merged.get(field) for field in value}
+
+class PatchState:
+    # The arrays a patch touches, as stored, with each operation applied in
+    # Python as it is translated. Provides the current element for validating
+    # `replace`/`move`, and the final arrays when the patch cannot be written
+    # as a single positional update.
+
+    def __init__(self, document: Dict[str, Any]):
+        self.document = document
+        self.arrays: Dict[str, List[Dict[str, Any]]] = {}
+
+    def array(self, path: str) -> List[Dict[str, Any]]:
+        if path not in self.arrays:
+            if path == "canvasElements":
+                elements = self.document.get("canvasElements") or []
+            else:
+                index = int(path.split(".")[1])
+                pages = self.document.get("pages") or []
+                if index >= len(pages):
+                    raise PatchError(f"Page {index + 1} does not exist")
+                elements = pages[index].get("layout") or []
+            self.arrays[path] = [dict(e) for e in elements]
+        return self.arrays[path]
+
+    def element(self, path: str, element_id: str) -> Dict[str, Any]:
+        for element in self.array(path):
+            if element.get("id") == element_id:
+                return element
+        raise PatchError(f"Element {element_id} not found")
+
+    def push(self, path: str, element: Dict[str, Any]):
+        self.array(path).append(dict(element))
+
+    def pull(self, path: str, element_id: str):
+        self.element(path, element_id)
+        self.arrays[path] = [e for e in self.array(path) if e.get("id") != element_id]
+
+    def set(self, path: str, element_id: str, fields: Dict[str, Any]):
+        # Like the positional update, applies to every element with this id.
+        for element in self.array(path):
+            if element.get("id") == element_id:
+                element.update(fields)
+
+    def set_fields(self) -> Dict[str, Any]:
+        return {path: elements for path, elements in self.arrays.items()}
+
+def build_update(operations: List[ElementOperation], document: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    # Returns one (update, array_filters) pair for the whole patch, or None if
+    # it changes nothing. Consecutive compatible operations share a positional
+    # batch; a conflicting one starts the next. `document` is the stored
+    # document (canvasElements and pages[].layout) the patch applies to.
+    state = PatchState(document)
+    batches = [UpdateBatch()]
+
+    def batch_for(*paths_and_kinds: Tuple[str, str]) -> UpdateBatch:
+        if not all(batches[-1].accepts(path, kind) for path, kind in paths_and_kinds):
+            batches.append(UpdateBatch())
+        return batches[-1]
+
+    for operation in operations:
+        path = array_path(operation.page)
+
+        if operation.op == "add":
+            element = validate_element(operation.value)
+            state.push(path, element)
+            batch_for((path, "push")).add_push(path, element)
+            continue
+
+        if not operation.id:
+            raise PatchError(f"'{operation.op}' requires an element id")
+
+        if operation.op == "remove":
+            state.pull(path, operation.id)
+            batch_for((path, "pull")).add_pull(path, operation.id)
+        elif operation.op == "replace":
+            fields = validate_fields(state.element(path, operation.id), operation.value, ELEMENT_FIELDS)
+            state.set(path, operation.id, fields)
+            batch_for((path, "set")).add_set(path, operation.id, fields)
+        elif operation.toPage is not None and operation.page is not None and operation.toPage != operation.page:
+            # Moving between page layouts: pull from one array, push onto the other.
+            element = validate_element(operation.value)
+            if element["id"] != operation.id:
+                raise PatchError("value.id must match id")
+            target = array_path(operation.toPage)
+            state.pull(path, operation.id)
+            state.push(target, element)
+            batch = batch_for((path, "pull"), (target, "push"))
+            batch.add_pull(path, operation.id)
+            batch.add_push(target, element)
+        else:
+            fields = validate_fields(state.element(path, operation.id), operation.value, MOVE_FIELDS)
+            state.set(path, operation.id, fields)
+            batch_for((path, "set")).add_set(path, operation.id, fields)
+
+    updates = [batch.to_update() for batch in batches if batch.kinds]
+    if len(updates) > 1:
+        # Operations MongoDB cannot combine in one update: write the touched
+        # arrays whole instead, so the patch still lands in a single atomic update.
+        return {"$set": state.set_fields()}, []
+    return updates[0] if updates else None
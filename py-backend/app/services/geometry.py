@@ -0,0 +1,208 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+# Columnar view of a document's positioned canvas elements (the FieldElement
+# types: x/y/width/height/page in editor pixels of the rendered page image).
+# Scaling, translating and hit-testing run over whole columns at once instead
+# of element by element.
+
+# Grid cell size in editor pixels; a letter page at 150 DPI is about 5 x 7 cells.
+GRID_CELL_SIZE = 256.0
+# Bound on region query coordinates, far beyond any rendered page. Element
+# boxes are clipped to it before they are registered in the grid.
+MAX_COORDINATE = 100000.0
+# Elements spanning more cells than this are kept out of the grid and tested
+# against every query instead, so the index stays linear in the element count.
+MAX_ELEMENT_CELLS = 64
+
+class GeometryError(ValueError):
+    pass
+
+def placed_elements(elements: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    # Elements without a position (flow layout blocks) have no geometry here.
+    return [e for e in elements or [] if all(e.get(k) is not None for k in ("x", "y", "width", "height"))]
+
+class ElementFrame:
+    def __init__(self, ids: List[str], page: np.ndarray, x: np.ndarray, y: np.ndarray, width: np.ndarray, height: np.ndarray):
+        self.ids = ids
+        self.page = page
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def from_elements(cls, elements: Optional[List[Dict[str, Any]]]) -> "ElementFrame":
+        # Row i is placed_elements(elements)[i].
+        placed = placed_elements(elements)
+        columns = np.array(
+            [(e.get("page") or 1, e["x"], e["y"], e["width"], e["height"]) for e in placed], dtype=np.float64
+        ).reshape(-1, 5)
+        return cls(
+            [str(e.get("id")) for e in placed],
+            columns[:, 0].astype(np.int64),
+            columns[:, 1].copy(), columns[:, 2].copy(), columns[:, 3].copy(), columns[:, 4].copy(),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def right(self) -> np.ndarray:
+        return self.x + self.width
+
+    @property
+    def bottom(self) -> np.ndarray:
+        return self.y + self.height
+
+    def transform(self, sx, sy, dx=0.0, dy=0.0) -> "ElementFrame":
+        # Scalars or one value per element.
+        return ElementFrame(self.ids, self.page, self.x * sx + dx, self.y * sy + dy, self.width * sx, self.height * sy)
+
+    def page_factors(self, source: Dict[str, Dict[str, float]], target: Dict[str, Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+        # Per-element scale factors from `source` to `target` page sizes, both
+        # keyed by page number like DocumentModel.pageDimensions.
+        pages = np.unique(self.page)
+        sx = np.ones(len(pages))
+        sy = np.ones(len(pages))
+        for i, page in enumerate(pages):
+            before, after = source.get(str(page)), target.get(str(page))
+            if not before or not after:
+                raise GeometryError(f"Missing page dimensions for page {page}")
+            if not before.get("width") or not before.get("height"):
+                raise GeometryError(f"Invalid page dimensions for page {page}")
+            sx[i] = after["width"] / before["width"]
+            sy[i] = after["height"] / before["height"]
+        index = np.searchsorted(pages, self.page)
+        return sx[index], sy[index]
+
+    def rescale(self, source: Dict[str, Dict[str, float]], target: Dict[str, Dict[str, float]]) -> "ElementFrame":
+        sx, sy = self.page_factors(source, target)
+        return self.transform(sx, sy)
+
+    def to_pdf_points(self, dpi: float, page_heights: Optional[Dict[str, float]] = None) -> "ElementFrame":
+        # Image pixels at `dpi` to PDF points. With the pages' heights in points
+        # the y axis is also flipped to PDF's bottom-left origin (y is then the
+        # element's lower edge).
+        factor = 72.0 / dpi
+        frame = self.transform(factor, factor)
+        if page_heights is None:
+            return frame
+        heights = np.array([page_heights.get(str(p), np.nan) for p in self.page], dtype=np.float64)
+        if np.isnan(heights).any():
+            raise GeometryError("Missing page height")
+        return ElementFrame(frame.ids, frame.page, frame.x, heights - frame.y - frame.height, frame.width, frame.height)
+
+    def apply(self, elements: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Copies of `elements` (the list this frame was built from) with the
+        # geometry written back by row, so duplicate or missing ids stay distinct.
+        rows = iter(zip(self.x, self.y, self.width, self.height))
+        placed = {id(e) for e in placed_elements(elements)}
+        updated = []
+        for element in elements:
+            if id(element) in placed:
+                x, y, w, h = next(rows)
+                element = {**element, "x": float(x), "y": float(y), "width": float(w), "height": float(h)}
+            updated.append(element)
+        return updated
+
+class GridIndex:
+    # Uniform grid per page: every element is registered in each cell its box
+    # touches, so a query only tests elements sharing a cell with the region.
+
+    def __init__(self, frame: ElementFrame, cell_size: float = GRID_CELL_SIZE):
+        self.frame = frame
+        self.cell_size = cell_size
+        self.cells: Dict[Tuple[int, int, int], np.ndarray] = {}
+        # page -> {(cell_x, cell_y): members}, so a query only visits cells that exist.
+        self.pages: Dict[int, Dict[Tuple[int, int], np.ndarray]] = {}
+        self.oversized = np.empty(0, dtype=np.int64)
+        if not len(frame):
+            return
+
+        # Stored documents may predate finite-only validation; such elements
+        # are never indexed (comparisons with NaN never match anyway).
+        finite = np.isfinite(frame.x) & np.isfinite(frame.y) & np.isfinite(frame.width) & np.isfinite(frame.height)
+        clip = lambda v: np.clip(v, -MAX_COORDINATE, MAX_COORDINATE)
+        x0, y0 = clip(np.where(finite, frame.x, 0.0)), clip(np.where(finite, frame.y, 0.0))
+        x1, y1 = clip(np.where(finite, frame.right, 0.0)), clip(np.where(finite, frame.bottom, 0.0))
+        cx0, cy0, cx1, cy1 = self._cell_range(x0, y0, x1, y1)
+        # Negative sizes still register in the cell of their origin.
+        cx1, cy1 = np.maximum(cx1, cx0), np.maximum(cy1, cy0)
+        spans_x = cx1 - cx0 + 1
+        spans_y = cy1 - cy0 + 1
+        counts = spans_x * spans_y
+        self.oversized = np.flatnonzero(finite & (counts > MAX_ELEMENT_CELLS))
+        counts = np.where(finite & (counts <= MAX_ELEMENT_CELLS), counts, 0)
+        if not counts.any():
+            return
+        # One row per (element, cell) pair.
+        element = np.repeat(np.arange(len(frame)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        cell_x = cx0[element] + offset % spans_x[element]
+        cell_y = cy0[element] + offset // spans_x[element]
+        keys = np.stack([frame.page[element], cell_x, cell_y], axis=1)
+
+        order = np.lexsort((keys[:, 2], keys[:, 1], keys[:, 0]))
+        keys, element = keys[order], element[order]
+        starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+        for key, members in zip(keys[np.r_[0, starts]], np.split(element, starts)):
+            page, cell_x, cell_y = (int(k) for k in key)
+            self.cells[(page, cell_x, cell_y)] = members
+            self.pages.setdefault(page, {})[(cell_x, cell_y)] = members
+
+    def _cell_range(self, x0, y0, x1, y1):
+        size = self.cell_size
+        return (
+            np.floor(np.asarray(x0) / size).astype(np.int64),
+            np.floor(np.asarray(y0) / size).astype(np.int64),
+            np.floor(np.asarray(x1) / size).astype(np.int64),
+            np.floor(np.asarray(y1) / size).astype(np.int64),
+        )
+
+    def query(self, page: int, x: float, y: float, width: float, height: float, contained: bool = False) -> np.ndarray:
+        # Indices of elements intersecting (or, with `contained`, lying inside) the region.
+        x1, y1 = x + width, y + height
+        cx0, cy0, cx1, cy1 = (int(v) for v in self._cell_range(x, y, x1, y1))
+        # Cost is bounded by the page's occupied cells, not by the region's size.
+        found = [
+            members
+            for (cx, cy), members in self.pages.get(page, {}).items()
+            if cx0 <= cx <= cx1 and cy0 <= cy <= cy1
+        ]
+        found.append(self.oversized[self.frame.page[self.oversized] == page])
+        candidates = np.unique(np.concatenate(found))
+        frame = self.frame
+        if contained:
+            hit = (frame.x[candidates] >= x) & (frame.right[candidates] <= x1) & (frame.y[candidates] >= y) & (frame.bottom[candidates] <= y1)
+        else:
+            hit = (frame.x[candidates] <= x1) & (frame.right[candidates] >= x) & (frame.y[candidates] <= y1) & (frame.bottom[candidates] >= y)
+        return candidates[hit]
+
+    def overlaps(self, page: Optional[int] = None) -> List[Dict[str, Any]]:
+        # Pairs of elements whose boxes overlap with positive area.
+        pairs = []
+        for key, members in self.cells.items():
+            if len(members) < 2 or (page is not None and key[0] != page):
+                continue
+            a, b = np.triu_indices(len(members), k=1)
+            pairs.append(np.stack([members[a], members[b]], axis=1))
+        frame = self.frame
+        for big in self.oversized:
+            if page is not None and frame.page[big] != page:
+                continue
+            others = np.flatnonzero(frame.page == frame.page[big])
+            others = others[others != big]
+            pairs.append(np.stack([np.full(len(others), big), others], axis=1))
+        if not pairs:
+            return []
+        # A pair sharing several cells is only reported once.
+        pairs = np.unique(np.sort(np.concatenate(pairs), axis=1), axis=0)
+        a, b = pairs[:, 0], pairs[:, 1]
+        overlap_w = np.minimum(frame.right[a], frame.right[b]) - np.maximum(frame.x[a], frame.x[b])
+        overlap_h = np.minimum(frame.bottom[a], frame.bottom[b]) - np.maximum(frame.y[a], frame.y[b])
+        hit = (overlap_w > 0) & (overlap_h > 0)
+        return [
+            {"a": frame.ids[i], "b": frame.ids[j], "page": int(frame.page[i]), "area": float(w * h)}
+            for i, j, w, h in zip(a[hit], b[hit], overlap_w[hit], overlap_h[hit])
+        ]
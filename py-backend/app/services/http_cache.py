@@ -0,0 +1,22 @@
+from typing import Optional
+
+# HTTP validator helpers shared by routes and the compression middleware.
+
+def weaken_etag(etag: str) -> str:
+    # A compressed body is a different byte sequence, so its validator can only be weak.
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # Weak comparison (RFC 9110 13.1.2), as If-None-Match requires.
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
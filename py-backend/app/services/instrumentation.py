@@ -0,0 +1,163 @@
+import asyncio
+import functools
+import sys
+import threading
+import time
+from collections import Counter as FrameCounter
+from typing import Callable
+from fastapi.routing import APIRoute
+from app.config.metrics import PROFILING_ENABLED, PROFILE_INTERVAL
+from app.services.metrics import (
+    RequestTimings, current_timings, http_requests, http_duration, http_request_size,
+    http_response_size, request_mongodb, request_validation, request_serialization,
+)
+
+def _timed(endpoint: Callable) -> Callable:
+    # Marks when the endpoint body starts and ends, which splits a request into
+    # validation (before), handler and serialization (after).
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            timings = current_timings.get()
+            if timings:
+                timings.handler_start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                if timings:
+                    timings.handler_end = time.perf_counter()
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            timings = current_timings.get()
+            if timings:
+                timings.handler_start = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                if timings:
+                    timings.handler_end = time.perf_counter()
+    return wrapper
+
+class InstrumentedRoute(APIRoute):
+    # route_class for the API routers.
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed(endpoint), **kwargs)
+
+def route_label(scope) -> str:
+    # The route template, not the raw path, so ids do not explode label cardinality.
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    if scope.get("root_path"):
+        return scope["root_path"] + "/*"
+    if "endpoint" in scope:
+        # plain Starlette routes such as /openapi.json have no path parameters
+        return scope["path"]
+    return "unmatched"
+
+class StackSampler:
+    # Samples one thread's Python stack every `interval` seconds and counts
+    # identical stacks, i.e. the "folded" input format of flamegraph tools.
+    # Only the event loop thread is sampled: time in Motor's executor threads
+    # shows up as awaiting, and renders run in other processes.
+
+    def __init__(self, thread_id: int, interval: float = PROFILE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: FrameCounter = FrameCounter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+class MetricsMiddleware:
+    # Plain ASGI middleware (no body buffering, so streaming responses stay streamed).
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if PROFILING_ENABLED and b"profile=1" in scope.get("query_string", b"").split(b"&"):
+            await self._profile(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = current_timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        request_bytes = 0
+        response_bytes = 0
+        response_started = None
+
+        async def counting_receive():
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            nonlocal status, response_bytes, response_started
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_started = time.perf_counter()
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            current_timings.reset(token)
+            elapsed = time.perf_counter() - start
+            method, route = scope["method"], route_label(scope)
+            http_requests.inc(method, route, str(status))
+            http_duration.observe(elapsed, method, route)
+            http_request_size.observe(request_bytes, method, route)
+            http_response_size.observe(response_bytes, method, route)
+            request_mongodb.observe(timings.mongodb, method, route)
+            if timings.handler_start is not None:
+                request_validation.observe(timings.handler_start - start, method, route)
+            if timings.handler_end is not None and response_started is not None:
+                request_serialization.observe(max(0.0, response_started - timings.handler_end), method, route)
+
+    async def _profile(self, scope, receive, send):
+        # Runs the request normally but replies with the folded stack samples.
+        async def discard(message):
+            pass
+
+        sampler = StackSampler(threading.get_ident())
+        sampler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            sampler.stop()
+        body = sampler.folded().encode()
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/plain; charset=utf-8"),
+            (b"content-length", str(len(body)).encode()),
+        ]})
+        await send({"type": "http.response.body", "body": body})
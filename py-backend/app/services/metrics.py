@@ -0,0 +1,179 @@
+import threading
+from contextvars import ContextVar
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from pymongo import monitoring
+
+# Minimal Prometheus client: counters, gauges and histograms with labels,
+# rendered in the text exposition format. Updates may come from driver and
+# executor threads, so every metric takes a lock.
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+RENDER_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.labelnames, labels)} {_number(v)}" for labels, v in values]
+
+class Gauge(Metric):
+    # Value read at scrape time from a callback returning {label values: value}.
+    # kind="counter" exposes a count kept elsewhere (e.g. cache hit counters).
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), collect: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None, kind: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.collect = collect
+        self.kind = kind
+
+    def render(self) -> List[str]:
+        values = self.collect() if self.collect else {}
+        return self.header() + [f"{self.name}{_labels(self.labelnames, labels)} {_number(v)}" for labels, v in values.items()]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        lines = self.header()
+        for labels, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+http_requests = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status.", ("method", "route", "status")))
+http_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time from request start to the last response byte.", ("method", "route")))
+http_request_size = registry.register(Histogram(
+    "http_request_size_bytes", "Request body size.", ("method", "route"), SIZE_BUCKETS))
+http_response_size = registry.register(Histogram(
+    "http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS))
+request_mongodb = registry.register(Histogram(
+    "http_request_mongodb_seconds", "MongoDB command time spent per request.", ("method", "route")))
+request_validation = registry.register(Histogram(
+    "http_request_validation_seconds", "Body parsing, validation and dependency resolution before the handler runs.", ("method", "route")))
+request_serialization = registry.register(Histogram(
+    "http_response_serialization_seconds", "Response model validation and encoding after the handler returns.", ("method", "route")))
+mongodb_commands = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trips.", ("command", "collection", "outcome")))
+render_jobs = registry.register(Histogram(
+    "render_job_duration_seconds", "Wall time of render job attempts.", ("outcome",), RENDER_BUCKETS))
+render_pages = registry.register(Counter(
+    "render_pages_total", "Pages rendered by completed render jobs."))
+
+class RequestTimings:
+    # Accumulated per request; the command listener adds to the one in context
+    # (Motor copies the context into its executor threads).
+    __slots__ = ("mongodb", "handler_start", "handler_end")
+
+    def __init__(self):
+        self.mongodb = 0.0
+        self.handler_start: Optional[float] = None
+        self.handler_end: Optional[float] = None
+
+current_timings: ContextVar[Optional[RequestTimings]] = ContextVar("current_timings", default=None)
+
+class CommandMetrics(monitoring.CommandListener):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._collections: Dict[Tuple, str] = {}
+
+    def started(self, event):
+        target = event.command.get(event.command_name)
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = target if isinstance(target, str) else ""
+
+    def _finished(self, event, outcome: str):
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), "")
+        seconds = event.duration_micros / 1e6
+        mongodb_commands.observe(seconds, event.command_name, collection, outcome)
+        timings = current_timings.get()
+        if timings is not None:
+            timings.mongodb += seconds
+
+    def succeeded(self, event):
+        self._finished(event, "ok")
+
+    def failed(self, event):
+        self._finished(event, "error")
+
+command_metrics = CommandMetrics()
+# Registered globally so it applies to the client created later in the lifespan.
+monitoring.register(command_metrics)
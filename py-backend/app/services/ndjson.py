@@ -0,0 +1,139 @@
+from typing import AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional, Tuple, Type
+from bson import ObjectId
+from pydantic import BaseModel, ValidationError
+from pymongo import InsertOne, ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+import orjson
+from app.services.serialization import dumps
+
+# Tenant export/import as newline-delimited JSON, one document per line.
+# Export streams straight off a Motor cursor and import writes every
+# IMPORT_BATCH_SIZE lines, so memory use does not grow with the tenant.
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_BATCH_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+# MongoDB's document size limit; anything longer cannot be imported anyway.
+MAX_LINE_BYTES = 16 * 1024 * 1024
+MAX_REPORTED_ERRORS = 100
+
+class NDJSONError(ValueError):
+    pass
+
+async def export_ndjson(
+    collection,
+    query: Dict[str, Any],
+    prepare: Optional[Callable[[dict], Awaitable[Any]]] = None,
+) -> AsyncIterator[bytes]:
+    # `prepare` edits each document in place before it is written, e.g. to
+    # inline blob references so the export can be imported elsewhere.
+    cursor = collection.find(query).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+    async for doc in cursor:
+        if prepare:
+            await prepare(doc)
+        yield dumps(doc) + b"\n"
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    # Yields (1-based line number, line) from a byte stream split at arbitrary points.
+    buffer = bytearray()
+    number = 0
+    async for chunk in chunks:
+        buffer.extend(chunk)
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end < 0:
+                break
+            number += 1
+            yield number, bytes(buffer[start:end])
+            start = end + 1
+        del buffer[:start]
+        if len(buffer) > MAX_LINE_BYTES:
+            raise NDJSONError(f"Line {number + 1} is longer than {MAX_LINE_BYTES} bytes")
+    if buffer.strip():
+        yield number + 1, bytes(buffer)
+
+def model_loader(
+    model: Type[BaseModel],
+    business_id: str,
+    before: Optional[Callable[[dict], Awaitable[Any]]] = None,
+) -> Callable[[dict], Awaitable[dict]]:
+    # Turns an exported line back into a stored document: validated against the
+    # model (so ISO dates become datetimes again), moved to `business_id`, and
+    # keeping its original _id so re-running an import is idempotent.
+    async def load(raw: dict) -> dict:
+        if not isinstance(raw, dict):
+            raise NDJSONError("Expected a JSON object")
+        raw["business_id"] = business_id
+        if before:
+            await before(raw)
+        try:
+            doc = model.model_validate(raw).model_dump(by_alias=True, exclude_none=True, exclude={"id"})
+        except ValidationError as e:
+            raise NDJSONError(f"Invalid record: {e.errors(include_url=False)}")
+        raw_id = raw.get("_id")
+        if raw_id is not None:
+            if not ObjectId.is_valid(str(raw_id)):
+                raise NDJSONError("Invalid _id")
+            doc["_id"] = ObjectId(str(raw_id))
+        return doc
+    return load
+
+def _add_error(result: dict, line: int, message: str):
+    result["failed"] += 1
+    if len(result["errors"]) < MAX_REPORTED_ERRORS:
+        result["errors"].append({"line": line, "error": message})
+
+def _replace(business_id: str, doc: dict):
+    query = {"_id": doc["_id"], "business_id": business_id}
+    if "revision" not in doc:
+        return ReplaceOne(query, doc, upsert=True)
+    # A replaced document must get a revision above the stored one, or ETags
+    # and the flatten cache (both keyed by revision) would serve the old
+    # content. A new document keeps the revision from the file.
+    revision = {"$max": [doc["revision"], {"$add": [{"$ifNull": ["$revision", -1]}, 1]}]}
+    return UpdateOne(
+        query,
+        [{"$replaceWith": {"$mergeObjects": [{"$literal": doc}, {"revision": revision}]}}],
+        upsert=True
+    )
+
+async def _flush(collection, business_id: str, batch: List[Tuple[int, dict]], result: dict):
+    operations = [_replace(business_id, doc) if "_id" in doc else InsertOne(doc) for _, doc in batch]
+    try:
+        details = (await collection.bulk_write(operations, ordered=False)).bulk_api_result
+    except BulkWriteError as e:
+        # e.g. an _id that already belongs to another business
+        details = e.details
+        for error in details.get("writeErrors", []):
+            _add_error(result, batch[error["index"]][0], error.get("errmsg", "Write failed"))
+    result["inserted"] += details.get("nInserted", 0) + details.get("nUpserted", 0)
+    result["replaced"] += details.get("nMatched", 0)
+
+async def import_ndjson(
+    chunks: AsyncIterator[bytes],
+    collection,
+    business_id: str,
+    load: Callable[[dict], Awaitable[dict]],
+) -> Dict[str, Any]:
+    result = {"lines": 0, "inserted": 0, "replaced": 0, "failed": 0, "errors": []}
+    batch: List[Tuple[int, dict]] = []
+    try:
+        async for number, line in iter_lines(chunks):
+            if not line.strip():
+                continue
+            result["lines"] += 1
+            try:
+                batch.append((number, await load(orjson.loads(line))))
+            except ValueError as e:
+                # JSON, validation and blob errors skip the line and are reported.
+                _add_error(result, number, str(e))
+                continue
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await _flush(collection, business_id, batch, result)
+                batch = []
+    except NDJSONError as e:
+        result["aborted"] = str(e)
+    if batch:
+        await _flush(collection, business_id, batch, result)
+    return result
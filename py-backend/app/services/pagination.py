@@ -0,0 +1,45 @@
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+from bson import ObjectId
+
+# Keyset pagination over `_id`, newest first. ObjectIds embed their creation
+# time, so this is creation order, and with a {business_id: 1, _id: -1} index
+# every page is a bounded index range scan however deep the client pages.
+
+MAX_PAGE_SIZE = 1000
+
+def keyset_query(query: Dict[str, Any], cursor: Optional[str]) -> Dict[str, Any]:
+    if not cursor:
+        return query
+    if not ObjectId.is_valid(cursor):
+        raise ValueError("Invalid cursor")
+    return {**query, "_id": {"$lt": ObjectId(cursor)}}
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    # "name,status" -> ["name", "status"]; raises ValueError on unknown fields.
+    if not fields:
+        return None
+    requested = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = set(requested) - set(allowed)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+def build_projection(fields: Optional[Iterable[str]]) -> Optional[Dict[str, int]]:
+    if fields is None:
+        return None
+    return {field: 1 for field in fields}
+
+async def fetch_page(
+    collection,
+    query: Dict[str, Any],
+    limit: int,
+    cursor: Optional[str] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    # Reads one row past the page to learn whether there is a next page.
+    docs = await collection.find(keyset_query(query, cursor), projection) \
+        .sort("_id", -1) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+    next_cursor = str(docs[limit - 1]["_id"]) if len(docs) > limit else None
+    return docs[:limit], next_cursor
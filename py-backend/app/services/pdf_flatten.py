@@ -0,0 +1,261 @@
+import asyncio
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+from app.config.render import FLATTEN_CACHE_DIR, FLATTEN_RETENTION_SECONDS, RENDER_DPI
+from app.services.blob_store import read_blob, parse_data_url, is_blob_hash, BlobError
+from app.services.pdf_renderer import RenderError
+from app.services.workers import get_flatten_pool
+
+# Stamps a document's fillable canvasElements onto its uploaded PDF.
+#
+# Element coordinates are editor pixels on the rendered page image, whose size
+# is pageDimensions[page]; they are scaled onto the PDF page's crop box (the
+# area pdf2image renders). All elements of a page are drawn onto one overlay
+# page, and the overlay PDF is merged into the original in a single pass.
+# Fonts are the PDF base-14 fonts (nothing embedded) and each distinct image is
+# decoded and embedded once, however many pages it appears on.
+
+FLATTENED_TYPES = {"text-field", "signature", "date", "initials", "checkbox"}
+DEFAULT_FONT_SIZE = 12
+FONTS = {
+    (False, False): "Helvetica",
+    (True, False): "Helvetica-Bold",
+    (False, True): "Helvetica-Oblique",
+    (True, True): "Helvetica-BoldOblique",
+}
+
+def _color(value: Optional[str]):
+    from reportlab.lib import colors
+    try:
+        return colors.HexColor(value) if value else colors.black
+    except (ValueError, TypeError):
+        return colors.black
+
+def _font(element: Dict[str, Any]) -> str:
+    bold = str(element.get("fontWeight") or "").lower() in ("bold", "bolder", "600", "700", "800", "900")
+    italic = element.get("fontStyle") == "italic"
+    return FONTS[(bold, italic)]
+
+def _draw_text(c, text: str, box, element: Dict[str, Any], scale: float, fit: bool = False):
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    x, y, width, height = box
+    font = _font(element)
+    size = (element.get("fontSize") or DEFAULT_FONT_SIZE) * scale
+    if fit:
+        # Initials and typed signatures fill their box.
+        size = min(height * 0.7, size * 2)
+        text_width = stringWidth(text, font, size)
+        if text_width > width:
+            size *= width / text_width
+
+    lines = simpleSplit(text, font, size, width) or [""]
+    align = element.get("textAlign") or ("center" if fit else "left")
+    c.setFont(font, size)
+    c.setFillColor(_color(element.get("color")))
+    c.setStrokeColor(_color(element.get("color")))
+    leading = size * 1.2
+    baseline = y + height - size if not fit else y + (height - size) / 2 + size * 0.2
+    for line in lines:
+        if baseline < y - size:
+            break
+        line_width = stringWidth(line, font, size)
+        if align == "center":
+            left = x + (width - line_width) / 2
+        elif align == "right":
+            left = x + width - line_width
+        else:
+            left = x
+        c.drawString(left, baseline, line)
+        if element.get("textDecoration") == "underline":
+            c.setLineWidth(max(0.5, size / 15))
+            c.line(left, baseline - size * 0.12, left + line_width, baseline - size * 0.12)
+        baseline -= leading
+
+def _draw_checkbox(c, box, element: Dict[str, Any]):
+    x, y, width, height = box
+    side = min(width, height)
+    left, bottom = x + (width - side) / 2, y + (height - side) / 2
+    c.setStrokeColor(_color(element.get("color")))
+    c.setLineWidth(max(0.5, side / 15))
+    c.rect(left, bottom, side, side)
+    if element.get("checked"):
+        c.line(left + side * 0.2, bottom + side * 0.5, left + side * 0.42, bottom + side * 0.25)
+        c.line(left + side * 0.42, bottom + side * 0.25, left + side * 0.8, bottom + side * 0.78)
+
+def _draw_element(c, element: Dict[str, Any], box, scale: float, images: Dict[str, Any]):
+    kind = element.get("type")
+    if kind == "checkbox":
+        _draw_checkbox(c, box, element)
+    elif kind == "signature":
+        image = images.get(element.get("imageKey"))
+        if image is not None:
+            x, y, width, height = box
+            c.drawImage(image, x, y, width, height, preserveAspectRatio=True, anchor="c", mask="auto")
+        elif element.get("content"):
+            _draw_text(c, element["content"], box, {**element, "fontStyle": "italic"}, scale, fit=True)
+    elif kind == "initials":
+        if element.get("content"):
+            _draw_text(c, element["content"], box, element, scale, fit=True)
+    elif kind == "date":
+        if element.get("value"):
+            _draw_text(c, element["value"], box, element, scale)
+    elif element.get("content"):
+        _draw_text(c, element["content"], box, element, scale)
+
+def flatten_pdf(
+    pdf_path: str,
+    output_path: str,
+    elements_by_page: Dict[int, List[Dict[str, Any]]],
+    page_dimensions: Dict[str, Dict[str, float]],
+    images: Dict[str, bytes],
+) -> str:
+    # Runs inside a worker process.
+    from pypdf import PdfReader, PdfWriter
+    from reportlab.lib.utils import ImageReader
+    from reportlab.pdfgen import canvas
+
+    reader = PdfReader(pdf_path)
+    writer = PdfWriter(clone_from=reader)
+    # Decoded once per process call; reportlab names image XObjects by content
+    # digest, so each one is embedded a single time in the overlay.
+    decoded = {key: ImageReader(io.BytesIO(data)) for key, data in images.items()}
+
+    targets = sorted(p for p in elements_by_page if 1 <= p <= len(writer.pages))
+    overlay_buffer = io.BytesIO()
+    overlay = canvas.Canvas(overlay_buffer)
+    for page_number in targets:
+        page = writer.pages[page_number - 1]
+        if page.rotation:
+            # Editor coordinates are relative to the page as displayed.
+            page.transfer_rotation_to_content()
+        box = page.cropbox
+        left, bottom = float(box.left), float(box.bottom)
+        pdf_width, pdf_height = float(box.width), float(box.height)
+
+        dims = page_dimensions.get(str(page_number)) or {}
+        # Pages rendered before pageDimensions existed: assume the default render DPI.
+        sx = pdf_width / dims["width"] if dims.get("width") else 72 / RENDER_DPI
+        sy = pdf_height / dims["height"] if dims.get("height") else 72 / RENDER_DPI
+
+        overlay.setPageSize((float(page.mediabox.right), float(page.mediabox.top)))
+        for element in elements_by_page[page_number]:
+            width, height = element["width"] * sx, element["height"] * sy
+            x = left + element["x"] * sx
+            y = bottom + pdf_height - element["y"] * sy - height
+            _draw_element(overlay, element, (x, y, width, height), sy, decoded)
+        overlay.showPage()
+    overlay.save()
+
+    if targets:
+        stamped = PdfReader(io.BytesIO(overlay_buffer.getvalue()))
+        for overlay_page, page_number in zip(stamped.pages, targets):
+            writer.pages[page_number - 1].merge_page(overlay_page)
+    if hasattr(writer, "compress_identical_objects"):
+        writer.compress_identical_objects()
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(output_path), suffix=".pdf")
+    with os.fdopen(fd, "wb") as f:
+        writer.write(f)
+    os.replace(tmp, output_path)
+    return output_path
+
+async def collect_images(elements: List[Dict[str, Any]]) -> Dict[str, bytes]:
+    # Signature images, keyed by blob hash (or digest of an inline data URL),
+    # loaded once each and attached to their elements as `imageKey`.
+    images: Dict[str, bytes] = {}
+    for element in elements:
+        if element.get("type") != "signature":
+            continue
+        key = None
+        if is_blob_hash(element.get("imageBlob") or ""):
+            key = element["imageBlob"]
+            if key not in images:
+                try:
+                    data = await read_blob(key)
+                except FileNotFoundError:
+                    data = None
+                if data:
+                    images[key] = data
+        elif element.get("imageData"):
+            try:
+                parsed = parse_data_url(element["imageData"])
+            except BlobError:
+                parsed = None
+            if parsed:
+                key = hashlib.sha256(parsed[0]).hexdigest()
+                images.setdefault(key, parsed[0])
+        if key in images:
+            element["imageKey"] = key
+    return images
+
+def flattened_path(document_id: str, revision: int) -> str:
+    return os.path.join(FLATTEN_CACHE_DIR, document_id, f"{revision}.pdf")
+
+def prune_flattened(directory: str, keep: str):
+    # Older revisions can no longer be requested, but a download that resolved
+    # one just before the edit may still be opening it; the mtime (refreshed on
+    # every cache hit) says when a file was last handed out.
+    cutoff = time.time() - FLATTEN_RETENTION_SECONDS
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if name.endswith(".pdf") and path != keep and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def remove_flattened(document_id: str):
+    # Every cached revision of a deleted document.
+    shutil.rmtree(os.path.join(FLATTEN_CACHE_DIR, document_id), ignore_errors=True)
+
+_in_flight: Dict[str, asyncio.Future] = {}
+
+async def get_flattened_pdf(document: Dict[str, Any], pdf_path: str) -> str:
+    # Cached per document revision: every edit bumps the revision, so a cached
+    # file is never stale and repeat downloads are served straight from disk.
+    document_id = str(document["_id"])
+    output_path = flattened_path(document_id, document.get("revision", 0))
+    try:
+        os.utime(output_path)
+        return output_path
+    except FileNotFoundError:
+        pass
+    if output_path in _in_flight:
+        return await asyncio.shield(_in_flight[output_path])
+
+    future = asyncio.get_running_loop().create_future()
+    _in_flight[output_path] = future
+    try:
+        elements = [dict(e) for e in document.get("canvasElements") or [] if e.get("type") in FLATTENED_TYPES]
+        images = await collect_images(elements)
+        elements_by_page: Dict[int, List[Dict[str, Any]]] = {}
+        for element in elements:
+            elements_by_page.setdefault(int(element.get("page") or 1), []).append(element)
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                get_flatten_pool(), flatten_pdf,
+                pdf_path, output_path, elements_by_page, document.get("pageDimensions") or {}, images
+            )
+        except Exception as e:
+            raise RenderError(f"Failed to flatten PDF: {e}") from e
+
+        await asyncio.to_thread(prune_flattened, os.path.dirname(output_path), output_path)
+        future.set_result(output_path)
+        return output_path
+    except BaseException as e:
+        future.set_exception(e if isinstance(e, Exception) else RenderError("Flatten cancelled"))
+        # Mark retrieved so a build nobody else waited on does not log a warning.
+        future.exception()
+        raise
+    finally:
+        del _in_flight[output_path]
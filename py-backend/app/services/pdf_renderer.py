@@ -0,0 +1,196 @@
+import asyncio
+import os
+from itertools import islice
+from typing import List, Dict, Any, Tuple, Callable, Awaitable, Optional
+from PIL import Image
+from pdf2image import convert_from_path, pdfinfo_from_path
+from app.config.render import (
+    UPLOAD_DIR, RENDER_DIR, RENDER_URL_PREFIX, RENDER_DPI, RENDER_FORMAT, RENDER_WINDOW, RENDER_WINDOWS_IN_FLIGHT,
+    RENDER_THUMBNAIL_WIDTH, RENDER_THUMBNAIL_FORMAT, RENDER_PRINT_DPI, RENDER_PRINT_FORMAT,
+)
+from app.services.workers import get_process_pool
+
+# Page numbers are 1-based everywhere (pdf2image first_page/last_page, pageDimensions keys, file names).
+
+FORMAT_EXTENSIONS = {"jpeg": "jpg", "png": "png", "webp": "webp", "avif": "avif"}
+
+class RenderError(Exception):
+    pass
+
+def resolve_upload_path(upload_path: str) -> str:
+    # uploadPath comes from clients: only files under UPLOAD_DIR may be read,
+    # after following symlinks and ".." segments.
+    if not upload_path:
+        raise RenderError("uploadPath is empty")
+    if os.path.isabs(upload_path):
+        raise RenderError("uploadPath must be relative to the upload directory")
+    root = os.path.realpath(UPLOAD_DIR)
+    path = os.path.realpath(os.path.join(root, upload_path))
+    if os.path.commonpath([root, path]) != root or path == root:
+        raise RenderError(f"uploadPath is outside the upload directory: {upload_path}")
+    if not os.path.isfile(path):
+        raise RenderError(f"PDF not found: {upload_path}")
+    return path
+
+def get_page_count(pdf_path: str) -> int:
+    return int(pdfinfo_from_path(pdf_path)["Pages"])
+
+def split_page_ranges(total_pages: int, window: int) -> List[Tuple[int, int]]:
+    # Contiguous (first_page, last_page) windows of at most `window` pages, in page order.
+    window = max(1, window)
+    return [(first, min(first + window - 1, total_pages)) for first in range(1, total_pages + 1, window)]
+
+def build_profile(
+    dpi: int = RENDER_DPI,
+    fmt: str = RENDER_FORMAT,
+    thumbnail_width: int = RENDER_THUMBNAIL_WIDTH,
+    thumbnail_format: str = RENDER_THUMBNAIL_FORMAT,
+    print_dpi: int = RENDER_PRINT_DPI,
+    print_format: str = RENDER_PRINT_FORMAT,
+) -> Dict[str, Any]:
+    # Everything that affects the rendered output; also part of the render cache key.
+    return {
+        "dpi": dpi,
+        "format": fmt,
+        "thumbnailWidth": thumbnail_width,
+        "thumbnailFormat": thumbnail_format,
+        "printDpi": print_dpi,
+        "printFormat": print_format,
+    }
+
+def page_file_name(page_number: int, fmt: str, variant: Optional[str] = None) -> str:
+    suffix = f".{variant}" if variant else ""
+    return f"page{page_number}{suffix}.{FORMAT_EXTENSIONS.get(fmt, fmt)}"
+
+def _save(image: Image.Image, output_dir: str, file_name: str, fmt: str):
+    if fmt == "jpeg" and image.mode != "RGB":
+        image = image.convert("RGB")
+    image.save(os.path.join(output_dir, file_name), fmt.upper())
+
+def render_page_range(pdf_path: str, output_dir: str, first_page: int, last_page: int, profile: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # Runs inside a worker process. Pages are decoded one at a time so a worker
+    # never holds more than a single bitmap, whatever the window size. Each page
+    # is decoded once at the highest DPI needed and downscaled for the others.
+    dpi = profile["dpi"]
+    print_dpi = profile["printDpi"]
+    decode_dpi = max(dpi, print_dpi)
+
+    rendered = []
+    for page_number in range(first_page, last_page + 1):
+        image = convert_from_path(pdf_path, dpi=decode_dpi, first_page=page_number, last_page=page_number)[0]
+        page = {"page": page_number}
+
+        if print_dpi:
+            page["printFileName"] = page_file_name(page_number, profile["printFormat"], "print")
+            _save(image, output_dir, page["printFileName"], profile["printFormat"])
+
+        if decode_dpi != dpi:
+            scale = dpi / decode_dpi
+            screen = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))), Image.LANCZOS)
+            image.close()
+            image = screen
+        page["fileName"] = page_file_name(page_number, profile["format"])
+        page["width"] = image.width
+        page["height"] = image.height
+        _save(image, output_dir, page["fileName"], profile["format"])
+
+        if profile["thumbnailWidth"]:
+            # thumbnail() shrinks in place and keeps the aspect ratio.
+            image.thumbnail((profile["thumbnailWidth"], image.height), Image.LANCZOS)
+            page["thumbnailFileName"] = page_file_name(page_number, profile["thumbnailFormat"], "thumb")
+            _save(image, output_dir, page["thumbnailFileName"], profile["thumbnailFormat"])
+
+        image.close()
+        rendered.append(page)
+    return rendered
+
+async def count_pages(pdf_path: str) -> int:
+    # pdfinfo is a subprocess, so a thread is enough; going through the render
+    # pool would queue uploads behind every pending page window.
+    try:
+        return await asyncio.to_thread(get_page_count, pdf_path)
+    except Exception as e:
+        raise RenderError(f"Failed to read PDF: {e}") from e
+
+async def render_pdf(
+    pdf_path: str,
+    document_id: str,
+    total_pages: int,
+    on_pages: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+    profile: Optional[Dict[str, Any]] = None,
+    window: int = RENDER_WINDOW,
+    in_flight: int = RENDER_WINDOWS_IN_FLIGHT,
+) -> List[Dict[str, Any]]:
+    # Windows go to the shared pool in page order, at most `in_flight` at a
+    # time, so the first pages land first and one large PDF cannot queue its
+    # whole length ahead of other jobs. `on_pages` is awaited as each window
+    # is written to disk.
+    loop = asyncio.get_running_loop()
+    pool = get_process_pool()
+    profile = profile or build_profile()
+
+    output_dir = os.path.join(RENDER_DIR, document_id)
+    os.makedirs(output_dir, exist_ok=True)
+
+    windows = iter(split_page_ranges(total_pages, window))
+
+    def submit(count: int):
+        return {
+            loop.run_in_executor(pool, render_page_range, pdf_path, output_dir, first, last, profile)
+            for first, last in islice(windows, count)
+        }
+
+    pending = submit(max(1, in_flight))
+    rendered = []
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                pages = future.result()
+                rendered.extend(pages)
+                pending |= submit(1)
+                if on_pages:
+                    await on_pages(pages)
+    except Exception as e:
+        for future in pending:
+            future.cancel()
+        raise RenderError(f"Failed to render PDF: {e}") from e
+
+    return sorted(rendered, key=lambda p: p["page"])
+
+def placeholder_page_fields(total_pages: int) -> Dict[str, Any]:
+    # Pages exist up front so each one can be filled in with a positional update.
+    return {
+        "pages": [
+            {
+                "pageSrc": None, "fromPdf": True, "imagePath": None, "layout": [],
+                "thumbnailSrc": None, "thumbnailPath": None, "printSrc": None, "printPath": None,
+            }
+            for _ in range(total_pages)
+        ],
+        "totalPages": total_pages,
+        "pageDimensions": {},
+        "renderProgress": 0,
+    }
+
+# (renderer output key, Page path field, Page URL field) for each image variant.
+RENDERED_FILES = [
+    ("fileName", "imagePath", "pageSrc"),
+    ("thumbnailFileName", "thumbnailPath", "thumbnailSrc"),
+    ("printFileName", "printPath", "printSrc"),
+]
+
+def rendered_page_files(page: Dict[str, Any]) -> List[str]:
+    return [page[file_key] for file_key, _, _ in RENDERED_FILES if page.get(file_key)]
+
+def rendered_page_updates(document_id: str, rendered: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # $set paths filling in the placeholders for the given rendered pages.
+    updates = {}
+    for page in rendered:
+        index = page["page"] - 1
+        for file_key, path_field, src_field in RENDERED_FILES:
+            if page.get(file_key):
+                updates[f"pages.{index}.{path_field}"] = os.path.join(RENDER_DIR, document_id, page[file_key])
+                updates[f"pages.{index}.{src_field}"] = f"{RENDER_URL_PREFIX}/{document_id}/{page[file_key]}"
+        updates[f"pageDimensions.{page['page']}"] = {"width": page["width"], "height": page["height"]}
+    return updates
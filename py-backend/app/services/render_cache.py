@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from typing import List, Dict, Any, Optional
+from app.config.render import RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES
+from app.services.pdf_renderer import rendered_page_files
+
+MANIFEST = "manifest.json"
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def link_or_copy(src: str, dst: str):
+    # Cache entries and document directories share files via hard links, so a
+    # hit costs no copying and evicting an entry never breaks a document.
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        pass
+    except OSError:
+        shutil.copyfile(src, dst)
+
+class RenderCache:
+    # Each entry is a directory <RENDER_CACHE_DIR>/<key>/ holding the page images
+    # and a manifest with their dimensions. The manifest mtime is the LRU clock.
+
+    def __init__(self, root: str = RENDER_CACHE_DIR, max_bytes: int = RENDER_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        # business_id -> {"hits", "misses", "stores"}; the entries themselves are shared.
+        self.tenants: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+        # Lookups and stores run in worker threads, so counters change under a lock.
+        self._counter_lock = threading.Lock()
+
+    def _count(self, counter: str, business_id: Optional[str]):
+        with self._counter_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+            if business_id:
+                tenant = self.tenants.setdefault(business_id, {"hits": 0, "misses": 0, "stores": 0})
+                tenant[counter] += 1
+
+    @staticmethod
+    def make_key(pdf_hash: str, profile: Dict[str, Any]) -> str:
+        # Readable DPI/format plus a digest of the remaining variant settings.
+        variants = hashlib.sha256(json.dumps(profile, sort_keys=True).encode()).hexdigest()[:12]
+        return f"{pdf_hash}-{profile['dpi']}-{profile['format']}-{variants}"
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def lookup(self, key: str, business_id: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+        # Blocking file I/O; call via asyncio.to_thread.
+        manifest_path = os.path.join(self._entry_dir(key), MANIFEST)
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            os.utime(manifest_path)
+        except (FileNotFoundError, ValueError):
+            self._count("misses", business_id)
+            return None
+        self._count("hits", business_id)
+        return manifest["pages"]
+
+    def materialize(self, key: str, pages: List[Dict[str, Any]], output_dir: str):
+        os.makedirs(output_dir, exist_ok=True)
+        entry_dir = self._entry_dir(key)
+        for page in pages:
+            for file_name in rendered_page_files(page):
+                link_or_copy(os.path.join(entry_dir, file_name), os.path.join(output_dir, file_name))
+
+    def store(self, key: str, pages: List[Dict[str, Any]], source_dir: str, business_id: Optional[str] = None):
+        os.makedirs(self.root, exist_ok=True)
+        if os.path.exists(os.path.join(self._entry_dir(key), MANIFEST)):
+            return
+
+        # Build the entry under a temporary name and rename it into place, so
+        # readers never see a partial entry and concurrent stores of the same
+        # key simply lose the race.
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=self.root)
+        try:
+            size = 0
+            for page in pages:
+                for file_name in rendered_page_files(page):
+                    dst = os.path.join(staging, file_name)
+                    link_or_copy(os.path.join(source_dir, file_name), dst)
+                    size += os.path.getsize(dst)
+            with open(os.path.join(staging, MANIFEST), "w") as f:
+                json.dump({"pages": pages, "size": size}, f)
+            os.rename(staging, self._entry_dir(key))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            return
+
+        self._count("stores", business_id)
+        self.evict()
+
+    def _entries(self) -> List[Dict[str, Any]]:
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for name in os.listdir(self.root):
+            manifest_path = os.path.join(self.root, name, MANIFEST)
+            try:
+                with open(manifest_path) as f:
+                    size = json.load(f).get("size", 0)
+                entries.append({"key": name, "size": size, "usedAt": os.path.getmtime(manifest_path)})
+            except (FileNotFoundError, NotADirectoryError, ValueError):
+                continue
+        return entries
+
+    def evict(self):
+        with self._lock:
+            entries = sorted(self._entries(), key=lambda e: e["usedAt"])
+            total = sum(e["size"] for e in entries)
+            for entry in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(self._entry_dir(entry["key"]), ignore_errors=True)
+                total -= entry["size"]
+                self.evictions += 1
+
+    def tenant_stats(self, business_id: str) -> Dict[str, int]:
+        with self._counter_lock:
+            return dict(self.tenants.get(business_id) or {"hits": 0, "misses": 0, "stores": 0})
+
+    def stats(self) -> Dict[str, Any]:
+        # Whole cache, across tenants.
+        entries = self._entries()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "bytes": sum(e["size"] for e in entries),
+            "maxBytes": self.max_bytes,
+        }
+
+render_cache = RenderCache()
@@ -0,0 +1,190 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Set, List
+from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
+from app.config.db import db
+from app.config.render import (
+    RENDER_JOB_WORKERS, RENDER_JOB_MAX_ATTEMPTS, RENDER_JOB_RETRY_DELAY, RENDER_JOB_STALE_SECONDS, RENDER_JOB_SWEEP_INTERVAL
+)
+from app.services.document_rendering import render_document_pages
+from app.services.metrics import render_jobs, render_pages
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ["queued", "running"]
+
+class RenderJobQueue:
+    # In-process queue of document render jobs. Job state lives in the
+    # `renderjobs` collection (keyed by document id) so it survives restarts;
+    # the asyncio queue only holds ids of jobs this process should pick up.
+    # A running job records the claiming process as `owner` and refreshes
+    # `updatedAt` as a heartbeat; jobs whose heartbeat stops are requeued by
+    # the sweep of any process.
+
+    def __init__(self, workers: int = RENDER_JOB_WORKERS, max_attempts: int = RENDER_JOB_MAX_ATTEMPTS):
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self._queued: Set[ObjectId] = set()
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Set[asyncio.Task] = set()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    async def start(self):
+        await self.recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweep()))
+
+    async def stop(self):
+        tasks = self._tasks + list(self._retries)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+        # Hand interrupted jobs back so the next process to start (or any
+        # other running one) picks them up without waiting for them to go stale.
+        await db.renderjobs.update_many(
+            {"status": "running", "owner": self.owner},
+            {"$set": {"status": "queued", "owner": None, "updatedAt": datetime.now()}, "$inc": {"attempts": -1}}
+        )
+
+    async def recover(self):
+        # Requeues running jobs whose owner stopped heartbeating (crashed
+        # process) and picks up every queued job.
+        stale_before = datetime.now() - timedelta(seconds=RENDER_JOB_STALE_SECONDS)
+        await db.renderjobs.update_many(
+            {"status": "running", "updatedAt": {"$lt": stale_before}},
+            {"$set": {"status": "queued", "owner": None, "updatedAt": datetime.now()}}
+        )
+        ready = {"status": "queued", "$or": [{"availableAt": None}, {"availableAt": {"$lte": datetime.now()}}]}
+        async for job in db.renderjobs.find(ready, {"_id": 1}):
+            self._put(job["_id"])
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(RENDER_JOB_SWEEP_INTERVAL)
+            try:
+                await self.recover()
+            except Exception:
+                logger.exception("Render job sweep failed")
+
+    async def _heartbeat(self, doc_id: ObjectId):
+        while True:
+            await asyncio.sleep(RENDER_JOB_STALE_SECONDS / 4)
+            await db.renderjobs.update_one(
+                {"_id": doc_id, "status": "running", "owner": self.owner},
+                {"$set": {"updatedAt": datetime.now()}}
+            )
+
+    async def enqueue(self, doc_id: ObjectId, business_id: str, pdf_path: str, total_pages: int) -> dict:
+        now = datetime.now()
+        job = {
+            "business_id": business_id,
+            "pdfPath": pdf_path,
+            "status": "queued",
+            "totalPages": total_pages,
+            "progress": 0,
+            "attempts": 0,
+            "maxAttempts": self.max_attempts,
+            "error": None,
+            "owner": None,
+            "availableAt": None,
+            "updatedAt": now,
+            "finishedAt": None,
+        }
+        try:
+            # Only (re)queue when there is no active job for this document; if
+            # there is one the upsert collides on _id and the existing job wins.
+            await db.renderjobs.update_one(
+                {"_id": doc_id, "status": {"$nin": ACTIVE_STATUSES}},
+                {"$set": job, "$setOnInsert": {"createdAt": now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            return await db.renderjobs.find_one({"_id": doc_id})
+
+        self._put(doc_id)
+        return {"_id": doc_id, "createdAt": now, **job}
+
+    def _put(self, doc_id: ObjectId):
+        if doc_id not in self._queued:
+            self._queued.add(doc_id)
+            self.queue.put_nowait(doc_id)
+
+    async def _requeue_later(self, doc_id: ObjectId, delay: float):
+        await asyncio.sleep(delay)
+        self._put(doc_id)
+
+    async def _worker(self):
+        while True:
+            doc_id = await self.queue.get()
+            self._queued.discard(doc_id)
+            try:
+                await self._run(doc_id)
+            except Exception:
+                logger.exception("Render job %s crashed", doc_id)
+            finally:
+                self.queue.task_done()
+
+    async def _run(self, doc_id: ObjectId):
+        job = await db.renderjobs.find_one_and_update(
+            {"_id": doc_id, "status": "queued"},
+            {"$set": {"status": "running", "owner": self.owner, "updatedAt": datetime.now()}, "$inc": {"attempts": 1}},
+            return_document=True
+        )
+        if not job:
+            return
+        owned = {"_id": doc_id, "owner": self.owner}
+
+        async def on_progress(progress: int):
+            await db.renderjobs.update_one(
+                owned,
+                {"$set": {"progress": progress, "updatedAt": datetime.now()}}
+            )
+
+        started = time.perf_counter()
+        heartbeat = asyncio.create_task(self._heartbeat(doc_id))
+        try:
+            await render_document_pages(doc_id, job["pdfPath"], job["totalPages"], on_progress=on_progress, business_id=job["business_id"])
+        except Exception as e:
+            retry = job["attempts"] < job.get("maxAttempts", self.max_attempts)
+            delay = RENDER_JOB_RETRY_DELAY * 2 ** (job["attempts"] - 1)
+            render_jobs.observe(time.perf_counter() - started, "retry" if retry else "failed")
+            await db.renderjobs.update_one(
+                owned,
+                {"$set": {
+                    "status": "queued" if retry else "failed",
+                    "owner": None,
+                    "error": str(e),
+                    "updatedAt": datetime.now(),
+                    "finishedAt": None if retry else datetime.now(),
+                    # Keeps sweeps from picking the job up before its backoff ends.
+                    "availableAt": datetime.now() + timedelta(seconds=delay) if retry else None,
+                }}
+            )
+            if retry:
+                logger.warning("Render job %s failed (attempt %s), retrying in %ss: %s", doc_id, job["attempts"], delay, e)
+                task = asyncio.create_task(self._requeue_later(doc_id, delay))
+                self._retries.add(task)
+                task.add_done_callback(self._retries.discard)
+            else:
+                logger.error("Render job %s failed permanently: %s", doc_id, e)
+            return
+        finally:
+            heartbeat.cancel()
+
+        render_jobs.observe(time.perf_counter() - started, "completed")
+        render_pages.inc(amount=job["totalPages"])
+        await db.renderjobs.update_one(
+            owned,
+            {"$set": {"status": "completed", "owner": None, "progress": 100, "error": None, "updatedAt": datetime.now(), "finishedAt": datetime.now()}}
+        )
+
+render_queue = RenderJobQueue()
@@ -0,0 +1,63 @@
+from typing import Any, Dict, Type
+from bson import ObjectId, Decimal128
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+import orjson
+
+# Read-only endpoints return documents straight from MongoDB. Returning a
+# BSONResponse skips FastAPI's response_model validation and serialization
+# (response_model stays on the route for the OpenAPI schema) and encodes the
+# BSON dicts to JSON bytes in one orjson pass.
+
+def bson_default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, Decimal128):
+        return float(value.to_decimal())
+    if isinstance(value, bytes):
+        return value.decode("utf-8", errors="replace")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    # orjson handles datetime natively (ISO 8601, same as pydantic for naive datetimes).
+    return orjson.dumps(content, default=bson_default, option=orjson.OPT_NON_STR_KEYS)
+
+class BSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class ResponseShape:
+    # What response_model would have done to a stored document, minus the
+    # validation: only the model's fields are fetched (via the projection) and
+    # top-level fields missing from older documents get the model's defaults.
+
+    def __init__(self, model: Type[BaseModel]):
+        self.projection: Dict[str, int] = {}
+        self.defaults: Dict[str, Any] = {}
+        self.factories: Dict[str, Any] = {}
+        for name, field in model.model_fields.items():
+            key = field.alias or name
+            self.projection[key] = 1
+            if field.default_factory is not None:
+                self.factories[key] = field.default_factory
+            elif field.default is not PydanticUndefined:
+                self.defaults[key] = field.default
+
+    def fill(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        for key, value in self.defaults.items():
+            if key not in doc:
+                doc[key] = value
+        for key, factory in self.factories.items():
+            if key not in doc:
+                doc[key] = factory()
+        return doc
+
+    def response(self, content: Any, **kwargs) -> BSONResponse:
+        if isinstance(content, list):
+            content = [self.fill(doc) for doc in content]
+        else:
+            content = self.fill(content)
+        return BSONResponse(content, **kwargs)
@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from typing import Optional
+from pymongo.errors import OperationFailure, PyMongoError
+from app.config.db import db
+from app.config.cache import SETTINGS_CACHE_TTL, SETTINGS_CACHE_MAX_ENTRIES, SETTINGS_CACHE_WATCH
+from app.services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Delay before reopening a change stream that failed (network blip, election).
+WATCH_RETRY_DELAY = 5
+
+class SettingsCache(TTLCache):
+    # Settings documents by business_id, optionally kept coherent across
+    # processes by watching the `settings` collection.
+
+    def __init__(self, ttl: float = SETTINGS_CACHE_TTL, max_entries: int = SETTINGS_CACHE_MAX_ENTRIES,
+                 watch: bool = SETTINGS_CACHE_WATCH):
+        super().__init__(ttl, max_entries)
+        self.watch = watch
+        self._watcher: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self.watch:
+            self._watcher = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self._watcher:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+
+    async def _watch(self):
+        while True:
+            try:
+                async with db.settings.watch(full_document="updateLookup") as stream:
+                    # Anything written while the stream was down is unknown.
+                    self.clear()
+                    async for change in stream:
+                        business_id = (change.get("fullDocument") or {}).get("business_id")
+                        if business_id:
+                            self.invalidate(business_id)
+                        else:
+                            # deletes carry no business_id, and drop/rename end the stream
+                            self.clear()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code == 40573:
+                    logger.warning("Settings change stream unavailable (not a replica set); relying on the cache TTL")
+                    return
+                logger.error("Settings change stream failed: %s", e)
+            except PyMongoError as e:
+                logger.error("Settings change stream failed: %s", e)
+            await asyncio.sleep(WATCH_RETRY_DELAY)
+
+settings_cache = SettingsCache()
@@ -0,0 +1,161 @@
+import logging
+from typing import Any, Dict, List, Optional
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
+from app.config.db import db
+
+logger = logging.getLogger(__name__)
+
+# Signing state of a document, kept in the document itself and only ever
+# changed with aggregation-pipeline updates, so it is derived from the stored
+# signers atomically with each write:
+#   signers[].status/signedAt - who has signed
+#   progress                  - percentage of signers/approvers who have signed
+#   pendingSigners            - emails whose signature is awaited now; indexed
+#                               (multikey) to find a signer's queue directly
+#   status                    - 'waiting' becomes 'completed' with the last signature
+
+# cc recipients only receive a copy.
+SIGNING_TYPES = ["signer", "approver"]
+
+# Written only by the workflow; never taken from clients.
+SIGNER_STATE_FIELDS = ("status", "signedAt")
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+def clean_signers(signers: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    return [{k: v for k, v in signer.items() if k not in SIGNER_STATE_FIELDS} for signer in signers or []]
+
+def _outstanding(signers: Any) -> Dict[str, Any]:
+    return {"$filter": {
+        "input": signers,
+        "as": "s",
+        "cond": {"$and": [{"$in": ["$$s.type", SIGNING_TYPES]}, {"$ne": ["$$s.status", "signed"]}]},
+    }}
+
+def _order(signer: str) -> Dict[str, Any]:
+    return {"$ifNull": [f"{signer}.order", 0]}
+
+def _turn(signers: Any) -> Dict[str, Any]:
+    # Lowest order among outstanding signers; signers without an order share order 0.
+    return {"$min": {"$map": {"input": _outstanding(signers), "as": "s", "in": _order("$$s")}}}
+
+def _in_turn(signer: str) -> Dict[str, Any]:
+    return {"$or": [{"$ne": ["$signingOrder", True]}, {"$eq": [_order(signer), "$$turn"]}]}
+
+SIGNERS = {"$ifNull": ["$signers", []]}
+
+def sign_stage(email: str) -> Dict[str, Any]:
+    # Marks the signer's entries signed, if it is their turn.
+    return {"$set": {"signers": {"$let": {
+        "vars": {"turn": _turn(SIGNERS)},
+        "in": {"$map": {
+            "input": SIGNERS,
+            "as": "s",
+            "in": {"$cond": [
+                {"$and": [
+                    {"$eq": [{"$toLower": "$$s.email"}, email]},
+                    {"$in": ["$$s.type", SIGNING_TYPES]},
+                    {"$ne": ["$$s.status", "signed"]},
+                    _in_turn("$$s"),
+                ]},
+                {"$mergeObjects": ["$$s", {"status": "signed", "signedAt": "$$NOW"}]},
+                "$$s",
+            ]},
+        }},
+    }}}}
+
+def state_stages() -> list:
+    # Recomputes progress, pendingSigners and completion from the stored signers.
+    required = {"$filter": {"input": SIGNERS, "as": "s", "cond": {"$in": ["$$s.type", SIGNING_TYPES]}}}
+    signed = {"$filter": {"input": required, "as": "r", "cond": {"$eq": ["$$r.status", "signed"]}}}
+    return [
+        {"$set": {
+            "progress": {"$let": {
+                "vars": {"required": {"$size": required}, "signed": {"$size": signed}},
+                "in": {"$cond": [
+                    {"$gt": ["$$required", 0]},
+                    {"$toInt": {"$floor": {"$divide": [{"$multiply": ["$$signed", 100]}, "$$required"]}}},
+                    0,
+                ]},
+            }},
+            "pendingSigners": {"$cond": [
+                {"$eq": ["$status", "waiting"]},
+                {"$let": {
+                    "vars": {"turn": _turn(SIGNERS)},
+                    "in": {"$setUnion": [{"$map": {
+                        "input": {"$filter": {"input": _outstanding(SIGNERS), "as": "s", "cond": _in_turn("$$s")}},
+                        "as": "s",
+                        "in": {"$toLower": "$$s.email"},
+                    }}]},
+                }},
+                [],
+            ]},
+        }},
+        {"$set": {"status": {"$cond": [
+            {"$and": [{"$eq": ["$status", "waiting"]}, {"$eq": ["$progress", 100]}]},
+            "completed",
+            "$status",
+        ]}}},
+    ]
+
+def merge_signers_stage(signers: List[Dict[str, Any]]) -> Dict[str, Any]:
+    # Replaces the signer list while keeping the stored signing state of every
+    # signer that is still on it (same email and type).
+    return {"$set": {"signers": {"$map": {
+        "input": {"$literal": clean_signers(signers)},
+        "as": "n",
+        "in": {"$let": {
+            "vars": {"old": {"$arrayElemAt": [{"$filter": {
+                "input": SIGNERS,
+                "as": "o",
+                "cond": {"$and": [
+                    {"$eq": [{"$toLower": "$$o.email"}, {"$toLower": "$$n.email"}]},
+                    {"$eq": ["$$o.type", "$$n.type"]},
+                ]},
+            }}, 0]}},
+            "in": {"$mergeObjects": ["$$n", {"status": "$$old.status", "signedAt": "$$old.signedAt"}]},
+        }},
+    }}}}
+
+def update_pipeline(fields: Dict[str, Any]) -> list:
+    # A document update touching signers, signingOrder or status: the fields are
+    # set literally, then the signing state is recomputed in the same write.
+    fields = dict(fields)
+    stages = []
+    if "signers" in fields:
+        stages.append(merge_signers_stage(fields.pop("signers") or []))
+    head = {"$set": {
+        **{name: {"$literal": value} for name, value in fields.items()},
+        "revision": {"$add": [{"$ifNull": ["$revision", 0]}, 1]},
+    }}
+    return [head, *stages, *state_stages()]
+
+STATE_FIELDS = {"signers": 1, "progress": 1, "pendingSigners": 1, "status": 1, "revision": 1}
+
+async def sign_document(query: Dict[str, Any], email: str, projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+    # One atomic update: matches only while the signer is awaited, so a
+    # repeated or out-of-turn signature changes nothing and returns None.
+    email = normalize_email(email)
+    return await db.documents.find_one_and_update(
+        {**query, "status": "waiting", "pendingSigners": email},
+        [sign_stage(email), *state_stages(), {"$set": {"revision": {"$add": [{"$ifNull": ["$revision", 0]}, 1]}}}],
+        projection=projection,
+        return_document=ReturnDocument.AFTER
+    )
+
+async def backfill_signing_state() -> int:
+    # Waiting documents from before the workflow existed have no pendingSigners;
+    # derive it once so their signers can sign and find them. Idempotent.
+    try:
+        result = await db.documents.update_many(
+            {"status": "waiting", "pendingSigners": {"$exists": False}},
+            state_stages()
+        )
+    except OperationFailure as e:
+        logger.error("Could not backfill signing state: %s", e)
+        return 0
+    if result.modified_count:
+        logger.info("Backfilled signing state of %d documents", result.modified_count)
+    return result.modified_count
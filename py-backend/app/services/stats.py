@@ -0,0 +1,171 @@
+from datetime import datetime
+from typing import Dict, Any, Optional, List
+from pymongo.errors import DuplicateKeyError
+from app.config.db import db
+
+# Dashboard counters per business, stored in the `businessstats` collection.
+# They are computed with a single $facet aggregation and then kept current with
+# $inc deltas from the document/contract write paths, so reading them never
+# scans the collections. refresh_stats() recomputes them from scratch.
+
+DOCUMENT_STATUSES = ["draft", "waiting", "completed", "archived"]
+# ContractsFilters only tracks these statuses; drafts only count towards "all".
+CONTRACT_FILTER_STATUSES = ["active", "expired"]
+REFRESH_ATTEMPTS = 5
+
+def currency_key(currency: Optional[str]) -> str:
+    # Currency codes become field names, which may not contain "." or start with "$".
+    return (currency or "USD").replace(".", "_").replace("$", "_")
+
+def stats_pipeline(business_id: str):
+    return [
+        {"$match": {"business_id": business_id}},
+        {"$project": {"_id": 0, "kind": {"$literal": "document"}, "status": 1}},
+        {"$unionWith": {"coll": "contracts", "pipeline": [
+            {"$match": {"business_id": business_id}},
+            {"$project": {"_id": 0, "kind": {"$literal": "contract"}, "status": 1, "value": 1, "currency": 1}},
+        ]}},
+        {"$facet": {
+            "documents": [
+                {"$match": {"kind": "document"}},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+            ],
+            "contracts": [
+                {"$match": {"kind": "contract"}},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+            ],
+            "contractValue": [
+                {"$match": {"kind": "contract"}},
+                {"$group": {"_id": "$currency", "total": {"$sum": "$value"}}},
+            ],
+        }},
+    ]
+
+async def compute_stats(business_id: str) -> Dict[str, Any]:
+    result = (await db.documents.aggregate(stats_pipeline(business_id)).to_list(1))[0]
+
+    documents = {row["_id"]: row["count"] for row in result["documents"]}
+    contracts = {row["_id"]: row["count"] for row in result["contracts"]}
+    by_currency = {currency_key(row["_id"]): row["total"] for row in result["contractValue"]}
+
+    documents_filters = {"all": sum(documents.values()), **{s: documents.get(s, 0) for s in DOCUMENT_STATUSES}}
+    contracts_filters = {"all": sum(contracts.values()), **{s: contracts.get(s, 0) for s in CONTRACT_FILTER_STATUSES}}
+    return {
+        "business_id": business_id,
+        "documentsFilters": documents_filters,
+        "contractsFilters": contracts_filters,
+        "stats": {
+            "totalDocuments": documents_filters["all"],
+            "activeContracts": contracts_filters["active"],
+            "pendingSignatures": documents_filters["waiting"],
+            "contractValue": sum(by_currency.values()),
+            "contractValueByCurrency": by_currency,
+        },
+    }
+
+async def refresh_stats(business_id: str) -> Dict[str, Any]:
+    # Every $inc also bumps `version`, so the recomputed counters are only
+    # written if no delta landed while aggregating; otherwise that delta might
+    # be missing from the result and the counters are computed again.
+    for attempt in range(REFRESH_ATTEMPTS):
+        current = await db.businessstats.find_one({"business_id": business_id}, {"version": 1})
+        stats = await compute_stats(business_id)
+        fields = {**stats, "updatedAt": datetime.now()}
+        if attempt == REFRESH_ATTEMPTS - 1:
+            # Under a steady stream of writes settle for the latest computation.
+            break
+        if current is None:
+            try:
+                return await db.businessstats.find_one_and_update(
+                    {"business_id": business_id},
+                    {"$set": {**fields, "version": 0}},
+                    upsert=True,
+                    return_document=True
+                )
+            except DuplicateKeyError:
+                # Created concurrently; compare versions on the next attempt.
+                continue
+        # Counters written before versioning have none, which matches None.
+        version = current.get("version")
+        updated = await db.businessstats.find_one_and_update(
+            {"business_id": business_id, "version": version},
+            {"$set": {**fields, "version": (version or 0) + 1}},
+            return_document=True
+        )
+        if updated:
+            return updated
+    return await db.businessstats.find_one_and_update(
+        {"business_id": business_id},
+        {"$set": fields, "$inc": {"version": 1}},
+        upsert=True,
+        return_document=True
+    )
+
+async def get_stats(business_id: str) -> Dict[str, Any]:
+    stats = await db.businessstats.find_one({"business_id": business_id})
+    if not stats:
+        stats = await refresh_stats(business_id)
+    return stats
+
+def _document_deltas(doc: Optional[dict], sign: int, inc: Dict[str, float]):
+    if not doc:
+        return
+    status = doc.get("status")
+    inc["documentsFilters.all"] = inc.get("documentsFilters.all", 0) + sign
+    inc["stats.totalDocuments"] = inc.get("stats.totalDocuments", 0) + sign
+    if status in DOCUMENT_STATUSES:
+        inc[f"documentsFilters.{status}"] = inc.get(f"documentsFilters.{status}", 0) + sign
+    if status == "waiting":
+        inc["stats.pendingSignatures"] = inc.get("stats.pendingSignatures", 0) + sign
+
+def _contract_deltas(contract: Optional[dict], sign: int, inc: Dict[str, float]):
+    if not contract:
+        return
+    status = contract.get("status")
+    value = contract.get("value") or 0
+    inc["contractsFilters.all"] = inc.get("contractsFilters.all", 0) + sign
+    if status in CONTRACT_FILTER_STATUSES:
+        inc[f"contractsFilters.{status}"] = inc.get(f"contractsFilters.{status}", 0) + sign
+    if status == "active":
+        inc["stats.activeContracts"] = inc.get("stats.activeContracts", 0) + sign
+    if value:
+        currency_field = f"stats.contractValueByCurrency.{currency_key(contract.get('currency'))}"
+        inc[currency_field] = inc.get(currency_field, 0) + sign * value
+        inc["stats.contractValue"] = inc.get("stats.contractValue", 0) + sign * value
+
+async def _apply(business_id: str, inc: Dict[str, float]):
+    inc = {field: delta for field, delta in inc.items() if delta}
+    if not inc:
+        return
+    # No upsert: if the counters have never been computed for this business the
+    # next read computes them from scratch, which already includes this change.
+    await db.businessstats.update_one(
+        {"business_id": business_id},
+        {"$inc": {**inc, "version": 1}, "$set": {"updatedAt": datetime.now()}}
+    )
+
+async def record_document_change(business_id: str, before: Optional[dict], after: Optional[dict]):
+    # before=None for inserts, after=None for deletes.
+    inc: Dict[str, float] = {}
+    _document_deltas(before, -1, inc)
+    _document_deltas(after, 1, inc)
+    await _apply(business_id, inc)
+
+async def record_contract_change(business_id: str, before: Optional[dict], after: Optional[dict]):
+    inc: Dict[str, float] = {}
+    _contract_deltas(before, -1, inc)
+    _contract_deltas(after, 1, inc)
+    await _apply(business_id, inc)
+
+async def record_document_inserts(business_id: str, docs: List[dict]):
+    # One counter update for a whole insert_many.
+    inc: Dict[str, float] = {}
+    for doc in docs:
+        _document_deltas(doc, 1, inc)
+    await _apply(business_id, inc)
+
+async def record_contract_inserts(business_id: str, contracts: List[dict]):
+    inc: Dict[str, float] = {}
+    for contract in contracts:
+        _contract_deltas(contract, 1, inc)
+    await _apply(business_id, inc)
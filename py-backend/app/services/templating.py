@@ -0,0 +1,95 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
+from app.services.cache import TTLCache
+
+# Merge fields: `{{ name }}` tokens in a document's text content are replaced
+# with the value of the variable called `name`. A document is compiled once
+# into the paths of its templated strings and their token lists; rendering a
+# variable set then only rebuilds the containers on those paths and shares
+# everything else with the template.
+
+TOKEN_PATTERN = re.compile(r"\{\{\s*([A-Za-z_][\w.-]*)\s*\}\}")
+# Compiled documents are keyed by id and revision, so entries never go stale;
+# the TTL only returns memory for templates that stop being used.
+TEMPLATE_CACHE_TTL = 3600
+TEMPLATE_CACHE_MAX_ENTRIES = 256
+
+# Literal text, or (variable name, original token) for a merge field.
+Part = Union[str, Tuple[str, str]]
+Path = Tuple[Union[str, int], ...]
+
+@lru_cache(maxsize=4096)
+def compile_text(text: str) -> Optional[Tuple[Part, ...]]:
+    # None when the text has no merge fields.
+    parts: List[Part] = []
+    position = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        if match.start() > position:
+            parts.append(text[position:match.start()])
+        parts.append((match.group(1), match.group(0)))
+        position = match.end()
+    if not parts:
+        return None
+    if position < len(text):
+        parts.append(text[position:])
+    return tuple(parts)
+
+def render_parts(parts: Tuple[Part, ...], values: Dict[str, str]) -> str:
+    # Unknown variables are left as written so they stay visible in the result.
+    return "".join(part if isinstance(part, str) else values.get(part[0], part[1]) for part in parts)
+
+def _element_paths(element: Dict[str, Any], prefix: Path) -> List[Path]:
+    paths = [prefix + (field,) for field in ("content", "subtitle", "placeholder") if isinstance(element.get(field), str)]
+    for r, row in enumerate(element.get("data") or []):
+        paths.extend(prefix + ("data", r, c) for c, cell in enumerate(row or []) if isinstance(cell, str))
+    return paths
+
+def text_paths(document: Dict[str, Any]) -> List[Path]:
+    # Every string a merge field may appear in.
+    paths: List[Path] = [("name",)]
+    for i, element in enumerate(document.get("canvasElements") or []):
+        paths.extend(_element_paths(element, ("canvasElements", i)))
+    for p, page in enumerate(document.get("pages") or []):
+        for i, element in enumerate(page.get("layout") or []):
+            paths.extend(_element_paths(element, ("pages", p, "layout", i)))
+    return paths
+
+def _get(container: Any, path: Path) -> Any:
+    for key in path:
+        container = container[key]
+    return container
+
+class CompiledTemplate:
+    def __init__(self, document: Dict[str, Any]):
+        self.document = document
+        # Nested {key: subtree} with compiled parts at the leaves, so rendering
+        # copies each container on a templated path exactly once.
+        self.tree: Dict[Any, Any] = {}
+        self.variables: set = set()
+        for path in text_paths(document):
+            value = _get(document, path)
+            parts = compile_text(value) if isinstance(value, str) else None
+            if not parts:
+                continue
+            node = self.tree
+            for key in path[:-1]:
+                node = node.setdefault(key, {})
+            node[path[-1]] = parts
+            self.variables.update(part[0] for part in parts if not isinstance(part, str))
+
+    def _render(self, container: Any, node: Dict[Any, Any], values: Dict[str, str]) -> Any:
+        copy = list(container) if isinstance(container, list) else dict(container)
+        for key, child in node.items():
+            if isinstance(child, dict):
+                copy[key] = self._render(container[key], child, values)
+            else:
+                copy[key] = render_parts(child, values)
+        return copy
+
+    def render(self, values: Dict[str, str]) -> Dict[str, Any]:
+        # A new top-level document; untemplated nested values are shared with
+        # the template and must not be mutated.
+        return self._render(self.document, self.tree, values)
+
+compiled_templates = TTLCache(ttl=TEMPLATE_CACHE_TTL, max_entries=TEMPLATE_CACHE_MAX_ENTRIES)
@@ -0,0 +1,29 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from app.config.render import RENDER_WORKERS, FLATTEN_WORKERS
+
+# Process pools for CPU-bound work: PDF rasterization, and PDF flattening on a
+# pool of its own so downloads do not wait behind queued page windows. Created
+# lazily so importing a route module never forks worker processes.
+_pool: Optional[ProcessPoolExecutor] = None
+_flatten_pool: Optional[ProcessPoolExecutor] = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS)
+    return _pool
+
+def get_flatten_pool() -> ProcessPoolExecutor:
+    global _flatten_pool
+    if _flatten_pool is None:
+        _flatten_pool = ProcessPoolExecutor(max_workers=FLATTEN_WORKERS)
+    return _flatten_pool
+
+def shutdown_process_pool():
+    global _pool, _flatten_pool
+    for pool in (_pool, _flatten_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+    _flatten_pool = None
@@ -0,0 +1,62 @@
+"""Validate/serialize throughput for large documents.
+
+Compares the tagged CanvasElement union against the plain Union it replaced,
+and times DocumentModel validation and dumping end to end.
+
+    python benchmarks/bench_element_validation.py [--elements 5000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Union
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from app.models.common import CanvasElement, ELEMENT_MODELS
+from app.models.document import DocumentModel
+from fixtures import make_document
+
+def make_benchmark_document(elements: int) -> dict:
+    # Fields are the tail of the union, the worst case for left-to-right matching.
+    return make_document("bench", 0, pages=20, elements=elements, blocks=10)
+
+def best_of(repeat: int, fn) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def report(label: str, seconds: float, count: int):
+    print(f"{label:<32} {seconds * 1000:9.1f} ms  {count / seconds:12,.0f} elements/s")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--elements", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    doc = make_benchmark_document(args.elements)
+    elements = doc["canvasElements"]
+    count = len(elements) + sum(len(page["layout"]) for page in doc["pages"])
+
+    plain = TypeAdapter(List[Union[ELEMENT_MODELS]])
+    tagged = TypeAdapter(List[CanvasElement])
+    plain_items = plain.validate_python(elements)
+    tagged_items = tagged.validate_python(elements)
+
+    report("validate plain Union", best_of(args.repeat, lambda: plain.validate_python(elements)), len(elements))
+    report("validate tagged union", best_of(args.repeat, lambda: tagged.validate_python(elements)), len(elements))
+    report("dump plain Union", best_of(args.repeat, lambda: plain.dump_python(plain_items)), len(elements))
+    report("dump tagged union", best_of(args.repeat, lambda: tagged.dump_python(tagged_items)), len(elements))
+
+    model = DocumentModel.model_validate(doc)
+    report("DocumentModel.model_validate", best_of(args.repeat, lambda: DocumentModel.model_validate(doc)), count)
+    report("DocumentModel.model_dump", best_of(args.repeat, lambda: model.model_dump(by_alias=True)), count)
+    report("DocumentModel.model_dump_json", best_of(args.repeat, lambda: model.model_dump_json(by_alias=True)), count)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""p50/p99 latency of large list responses: response_model vs BSONResponse.
+
+Serves the same in-memory BSON documents (ObjectIds, datetimes, pages and
+canvas elements) through two FastAPI routes, one returning them into
+response_model=List[DocumentModel] and one through ResponseShape, and times
+requests with the test client. No database is involved.
+
+    python benchmarks/bench_response_serialization.py [--documents 1000] [--requests 50]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.models.document import DocumentModel
+from app.services.serialization import ResponseShape
+from fixtures import make_document
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+def measure(client: TestClient, path: str, requests: int) -> List[float]:
+    client.get(path)  # warm up
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(path)
+        samples.append(time.perf_counter() - start)
+        response.raise_for_status()
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--documents", type=int, default=1000)
+    parser.add_argument("--elements", type=int, default=20, help="canvas elements per document")
+    parser.add_argument("--requests", type=int, default=50)
+    args = parser.parse_args()
+
+    documents = [{"_id": ObjectId(), **make_document("bench", i, pages=2, elements=args.elements, blocks=0)}
+                 for i in range(args.documents)]
+    shape = ResponseShape(DocumentModel)
+    app = FastAPI()
+
+    @app.get("/validated", response_model=List[DocumentModel], response_model_by_alias=True)
+    async def validated():
+        return documents
+
+    @app.get("/raw", response_model=List[DocumentModel], response_model_by_alias=True)
+    async def raw():
+        return shape.response(documents)
+
+    client = TestClient(app)
+    size = len(client.get("/raw").content)
+    print(f"{args.documents} documents x {args.elements} elements, {size / 1024:,.0f} KiB per response")
+    for label, path in (("response_model", "/validated"), ("BSONResponse", "/raw")):
+        samples = measure(client, path, args.requests)
+        print(f"{label:<16} p50 {percentile(samples, 0.5) * 1000:8.1f} ms   "
+              f"p99 {percentile(samples, 0.99) * 1000:8.1f} ms   mean {statistics.mean(samples) * 1000:8.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Synthetic documents and contracts shared by the benchmarks.
+
+Everything is deterministic for a given index, so runs are comparable.
+"""
+import os
+from datetime import datetime
+
+FIELD_TYPES = ["text-field", "signature", "date", "initials", "checkbox"]
+BLOCK_TYPES = ["heading", "image", "video", "table"]
+DOCUMENT_STATUSES = ["draft", "waiting", "completed"]
+CONTRACT_STATUSES = ["active", "draft", "expired"]
+# Editor page size at the default render DPI (letter at 150 DPI).
+PAGE_DIMENSIONS = {"width": 1275.0, "height": 1650.0}
+
+def make_field(i: int, page: int = 1) -> dict:
+    element = {"type": FIELD_TYPES[i % len(FIELD_TYPES)], "id": f"f{i}", "x": float(10 + i % 400),
+               "y": float(20 + (i * 37) % 700), "width": 120.0, "height": 30.0, "page": page}
+    if element["type"] in ("text-field", "initials"):
+        element["content"] = f"value {i}"
+    if element["type"] == "checkbox":
+        element["checked"] = i % 2 == 0
+    return element
+
+def make_block(i: int, page: int = 1) -> dict:
+    block = {"type": BLOCK_TYPES[i % len(BLOCK_TYPES)], "id": f"b{page}-{i}", "order": i, "height": 80.0,
+             "page": page, "padding": {"top": 4, "right": 4, "bottom": 4, "left": 4}}
+    if block["type"] == "heading":
+        block["content"] = f"Section {i}"
+    if block["type"] == "table":
+        block.update(rows=2, columns=2, data=[["a", "b"], ["c", "d"]])
+    return block
+
+def signer_email(i: int) -> str:
+    return f"signer{i}@example.com"
+
+def make_document(business_id: str, i: int, pages: int = 5, elements: int = 50, blocks: int = 3) -> dict:
+    # A stored document: `elements` fields spread over the pages and `blocks`
+    # layout blocks per page. Waiting documents await their one signer.
+    status = DOCUMENT_STATUSES[i % len(DOCUMENT_STATUSES)]
+    return {
+        "name": f"Benchmark document {i}",
+        "status": status,
+        "date": datetime.now(),
+        "signers": [{"name": "Signer", "email": signer_email(i), "type": "signer"}],
+        "pendingSigners": [signer_email(i)] if status == "waiting" else [],
+        "progress": 0,
+        "business_id": business_id,
+        "documentType": "new_document",
+        "totalPages": pages,
+        "pages": [{"fromPdf": False, "layout": [make_block(b, p) for b in range(blocks)]} for p in range(1, pages + 1)],
+        "pageDimensions": {str(p): dict(PAGE_DIMENSIONS) for p in range(1, pages + 1)},
+        "canvasElements": [make_field(e, 1 + e % pages) for e in range(elements)],
+        "revision": 0,
+    }
+
+def make_contract(business_id: str, i: int) -> dict:
+    return {
+        "name": f"Benchmark contract {i}",
+        "status": CONTRACT_STATUSES[i % len(CONTRACT_STATUSES)],
+        "value": float(100 + (i * 7919) % 100000),
+        "currency": "USD",
+        "date": datetime.now(),
+        "contractType": "Service Contract",
+        "business_id": business_id,
+    }
+
+def make_png(size: int) -> bytes:
+    # Random bytes behind a PNG signature: enough for the blob upload's type check.
+    return b"\x89PNG\r\n\x1a\n" + os.urandom(size)
@@ -0,0 +1,339 @@
+"""Load test for the API against a local MongoDB.
+
+Seeds synthetic tenants (documents with N pages and M canvas elements,
+contracts, settings), drives every router with a fixed number of concurrent
+clients and reports throughput and p50/p95/p99 latency per endpoint. With
+--pdf it also measures render throughput (pages/s) at each of --dpis.
+Results are written as JSON; pass an earlier result as --baseline to print
+the change per endpoint and fail on p95 regressions.
+
+    # in-process (no server needed), against MONGO_URI / DB_NAME
+    python benchmarks/load_test.py --output results.json
+    # against a running server that uses the same database
+    python benchmarks/load_test.py --base-url http://localhost:8080 --baseline results.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from app.config.metrics import METRICS_PATH
+from fixtures import make_contract, make_document, make_field, make_png, signer_email
+
+SEEDED_COLLECTIONS = ["documents", "contracts", "settings", "contractmanagements", "businessstats", "renderjobs"]
+
+async def seed(db, args, run_id: str) -> List[Dict[str, Any]]:
+    tenants = []
+    for t in range(args.tenants):
+        business_id = f"bench-{run_id}-{t}"
+        documents = [make_document(business_id, i, args.pages, args.elements) for i in range(args.documents)]
+        contracts = [make_contract(business_id, i) for i in range(args.contracts)]
+        for start in range(0, len(documents), 500):
+            await db.documents.insert_many(documents[start:start + 500])
+        if contracts:
+            await db.contracts.insert_many(contracts)
+        tenants.append({
+            "business_id": business_id,
+            "documents": [str(d["_id"]) for d in documents],
+            "contracts": [str(c["_id"]) for c in contracts],
+        })
+    return tenants
+
+# Blobs are not scoped to a tenant; every hash the run uploaded is removed by cleanup().
+uploaded_blobs: Set[str] = set()
+
+async def cleanup(db, tenants: List[Dict[str, Any]]):
+    from app.services.blob_store import get_blob_store
+
+    business_ids = [t["business_id"] for t in tenants]
+    for collection in SEEDED_COLLECTIONS:
+        await db[collection].delete_many({"business_id": {"$in": business_ids}})
+    # With BLOB_BACKEND=local this only reaches a server's blobs if it shares BLOB_DIR.
+    store = get_blob_store()
+    for blob_hash in uploaded_blobs:
+        await store.delete(blob_hash)
+
+class Scenario:
+    def __init__(self, name: str, method: str, path: Callable[[dict], str], body: Optional[Callable[[dict], Any]] = None,
+                 ok: tuple = (200, 201), max_requests: Optional[int] = None, raw: bool = False,
+                 prepare: Optional[Callable[[httpx.AsyncClient, dict], Awaitable[dict]]] = None,
+                 record: Optional[Callable[[httpx.Response], None]] = None):
+        # `prepare` runs untimed before each request and returns what path and
+        # body are built from (the tenant by default); `record` sees each response.
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.ok = ok
+        self.max_requests = max_requests
+        self.raw = raw
+        self.prepare = prepare
+        self.record = record
+
+def doc_id(t: dict) -> str:
+    return random.choice(t["documents"])
+
+def contract_id(t: dict) -> str:
+    return random.choice(t["contracts"])
+
+def q(t: dict) -> str:
+    return f"business_id={t['business_id']}"
+
+async def with_revision(client: httpx.AsyncClient, t: dict) -> dict:
+    # Picks a document and reads its current revision, as an editor would.
+    document = doc_id(t)
+    response = await client.get(f"/api/documents/{document}?{q(t)}")
+    response.raise_for_status()
+    return {**t, "document": document, "revision": response.json().get("revision", 0)}
+
+def record_blob(response: httpx.Response):
+    if response.status_code == 201:
+        uploaded_blobs.add(response.json()["hash"])
+
+SCENARIOS = [
+    Scenario("documents.list", "GET", lambda t: f"/api/documents?{q(t)}&limit=50"),
+    Scenario("documents.summary", "GET", lambda t: f"/api/documents/summary?{q(t)}&limit=50"),
+    Scenario("documents.get", "GET", lambda t: f"/api/documents/{doc_id(t)}?{q(t)}"),
+    Scenario("documents.create", "POST", lambda t: f"/api/documents?{q(t)}",
+             lambda t: {"name": "Load test", "canvasElements": [make_field(i) for i in range(10)]}),
+    Scenario("documents.update", "PUT", lambda t: f"/api/documents/{doc_id(t)}?{q(t)}",
+             lambda t: {"name": f"Renamed {random.random()}"}),
+    # Concurrent patches of the same document may still lose the race; 409 is the expected answer then.
+    Scenario("documents.patch", "PATCH", lambda t: f"/api/documents/{t['document']}/elements?{q(t)}",
+             lambda t: {"revision": t["revision"], "operations": [{"op": "move", "id": "f0", "value": {"x": 50, "y": 60}}]},
+             ok=(200, 409), prepare=with_revision),
+    Scenario("documents.export", "GET", lambda t: f"/api/documents/export?{q(t)}", max_requests=20),
+    Scenario("contracts.list", "GET", lambda t: f"/api/contracts?{q(t)}"),
+    Scenario("contracts.get", "GET", lambda t: f"/api/contracts/{contract_id(t)}?{q(t)}"),
+    Scenario("contracts.create", "POST", lambda t: f"/api/contracts?{q(t)}",
+             lambda t: {k: v for k, v in make_contract(t["business_id"], 0).items() if k != "date"}),
+    Scenario("contracts.update", "PUT", lambda t: f"/api/contracts/{contract_id(t)}?{q(t)}",
+             lambda t: {"value": float(random.randint(1, 1000))}),
+    Scenario("settings.get", "GET", lambda t: f"/api/settings?{q(t)}"),
+    Scenario("settings.update", "PUT", lambda t: f"/api/settings?{q(t)}",
+             lambda t: {"globalDocument": {"senderName": "Load test"}}),
+    Scenario("contract_management.get", "GET", lambda t: f"/api/contract-management?{q(t)}"),
+    Scenario("contract_management.stats", "GET", lambda t: f"/api/contract-management/stats?{q(t)}"),
+    # Every third seeded document is waiting on its signer.
+    Scenario("signers.pending", "GET", lambda t: f"/api/signers/{signer_email(random.randrange(len(t['documents'])))}/pending?{q(t)}"),
+    Scenario("blobs.get", "GET", lambda t: f"/api/blobs/{t['blob']}"),
+    Scenario("blobs.upload", "POST", lambda t: "/api/blobs", lambda t: make_png(32 * 1024), raw=True, record=record_blob),
+    Scenario("diagnostics.query_plans", "GET", lambda t: f"/api/diagnostics/query-plans?{q(t)}", max_requests=20),
+    Scenario("health.ready", "GET", lambda t: "/health/ready"),
+    # 404s (counted as errors) when the target runs with METRICS_ENABLED=false.
+    Scenario("metrics", "GET", lambda t: METRICS_PATH),
+]
+
+def percentile(ordered: List[float], p: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+def summarize(latencies: List[float], statuses: Counter, errors: int, wall: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "throughput": round(len(latencies) / wall, 2) if wall else 0,
+        "latencyMs": {
+            "min": ms(ordered[0]) if ordered else 0,
+            "mean": ms(statistics.mean(ordered)) if ordered else 0,
+            "p50": ms(percentile(ordered, 50)),
+            "p95": ms(percentile(ordered, 95)),
+            "p99": ms(percentile(ordered, 99)),
+            "max": ms(ordered[-1]) if ordered else 0,
+        },
+    }
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, tenants: List[dict], requests: int, concurrency: int):
+    total = min(requests, scenario.max_requests or requests)
+    remaining = iter(range(total))
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            tenant = random.choice(tenants)
+            try:
+                context = await scenario.prepare(client, tenant) if scenario.prepare else tenant
+            except httpx.HTTPError:
+                statuses["exception"] += 1
+                errors += 1
+                continue
+            kwargs = {}
+            if scenario.body:
+                kwargs["content" if scenario.raw else "json"] = scenario.body(context)
+            if scenario.raw:
+                kwargs["headers"] = {"content-type": "image/png"}
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, scenario.path(context), **kwargs)
+                await response.aread()
+                if scenario.record:
+                    scenario.record(response)
+                statuses[response.status_code] += 1
+                if response.status_code not in scenario.ok:
+                    errors += 1
+            except httpx.HTTPError:
+                statuses["exception"] += 1
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, total))))
+    return summarize(latencies, statuses, errors, time.perf_counter() - start)
+
+async def bench_render(pdf_path: str, dpis: List[int]) -> List[Dict[str, Any]]:
+    from app.config.render import RENDER_DIR
+    from app.services.pdf_renderer import build_profile, count_pages, render_pdf
+
+    total_pages = await count_pages(pdf_path)
+    results = []
+    for dpi in dpis:
+        document_id = f"bench-render-{uuid.uuid4().hex[:8]}"
+        start = time.perf_counter()
+        await render_pdf(pdf_path, document_id, total_pages, profile=build_profile(dpi=dpi, print_dpi=0))
+        elapsed = time.perf_counter() - start
+        shutil.rmtree(os.path.join(RENDER_DIR, document_id), ignore_errors=True)
+        results.append({"dpi": dpi, "pages": total_pages, "seconds": round(elapsed, 3),
+                        "pagesPerSecond": round(total_pages / elapsed, 2)})
+    return results
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[str]:
+    # Returns endpoints whose p95 got worse than the baseline by more than `threshold` percent.
+    regressions = []
+    print(f"\n{'endpoint':<28} {'p95 base':>10} {'p95 now':>10} {'change':>8}   {'rps base':>9} {'rps now':>9}")
+    for name, now in results["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(name)
+        if not base:
+            continue
+        base_p95, now_p95 = base["latencyMs"]["p95"], now["latencyMs"]["p95"]
+        change = (now_p95 - base_p95) / base_p95 * 100 if base_p95 else 0
+        flag = "  <-- regression" if change > threshold else ""
+        if flag:
+            regressions.append(name)
+        print(f"{name:<28} {base_p95:>10.2f} {now_p95:>10.2f} {change:>7.1f}%   {base['throughput']:>9.1f} {now['throughput']:>9.1f}{flag}")
+    return regressions
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def main(args) -> int:
+    if args.mongo_uri:
+        os.environ["MONGO_URI"] = args.mongo_uri
+    if args.db_name:
+        os.environ["DB_NAME"] = args.db_name
+
+    from app.config.db import connect, get_database
+    run_id = uuid.uuid4().hex[:8]
+    random.seed(args.seed)
+
+    results: Dict[str, Any] = {
+        "meta": {
+            "runId": run_id,
+            "startedAt": datetime.now().isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "target": args.base_url or "in-process",
+            "args": vars(args),
+        },
+        "endpoints": {},
+    }
+
+    if args.base_url:
+        await connect()
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+        lifespan = None
+    else:
+        from main import app
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app, raise_app_exceptions=False), base_url="http://bench", timeout=args.timeout)
+
+    db = get_database()
+    tenants = []
+    try:
+        seed_start = time.perf_counter()
+        tenants = await seed(db, args, run_id)
+        results["meta"]["seedSeconds"] = round(time.perf_counter() - seed_start, 3)
+        for tenant in tenants:
+            response = await client.post("/api/blobs", content=make_png(64 * 1024), headers={"content-type": "image/png"})
+            record_blob(response)
+            tenant["blob"] = response.json()["hash"]
+
+        selected = [s for s in SCENARIOS if not args.only or any(s.name.startswith(prefix) for prefix in args.only)]
+        for scenario in selected:
+            summary = await run_scenario(client, scenario, tenants, args.requests, args.concurrency)
+            results["endpoints"][scenario.name] = summary
+            lat = summary["latencyMs"]
+            print(f"{scenario.name:<28} {summary['throughput']:>9.1f} req/s  p50 {lat['p50']:>8.2f}  p95 {lat['p95']:>8.2f}  "
+                  f"p99 {lat['p99']:>8.2f} ms  errors {summary['errors']}")
+
+        if args.pdf:
+            results["render"] = await bench_render(args.pdf, [int(d) for d in args.dpis.split(",")])
+            for row in results["render"]:
+                print(f"render {row['dpi']:>4} dpi  {row['pages']} pages  {row['pagesPerSecond']:>7.2f} pages/s")
+    finally:
+        if not args.keep:
+            await cleanup(db, tenants)
+        await client.aclose()
+        if lifespan:
+            await lifespan.__aexit__(None, None, None)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=str)
+        print(f"\nWrote {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print(f"\np95 regressed by more than {args.threshold}%: {', '.join(regressions)}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="running server to test; default drives the app in-process")
+    parser.add_argument("--mongo-uri", help="database to seed (defaults to MONGO_URI); must be the one the server uses")
+    parser.add_argument("--db-name", help="defaults to DB_NAME")
+    parser.add_argument("--tenants", type=int, default=2)
+    parser.add_argument("--documents", type=int, default=200, help="documents per tenant")
+    parser.add_argument("--pages", type=int, default=5, help="pages per document")
+    parser.add_argument("--elements", type=int, default=50, help="canvas elements per document")
+    parser.add_argument("--contracts", type=int, default=200, help="contracts per tenant")
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--only", nargs="*", help="endpoint name prefixes to run, e.g. documents settings.get")
+    parser.add_argument("--pdf", help="PDF to render for the pages/s measurement")
+    parser.add_argument("--dpis", default="72,150,300")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=10, help="p95 regression tolerance in percent")
+    parser.add_argument("--keep", action="store_true", help="leave the seeded tenants in the database")
+    sys.exit(asyncio.run(main(parser.parse_args())))
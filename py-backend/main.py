@@ -1,14 +1,40 @@
 import uvicorn
 import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 
-from app.routes import document_routes, contract_routes, settings_routes, contract_management_routes
+from app.config.db import db, connect, close
+from app.config.indexes import ensure_indexes
+from app.config.render import RENDER_DIR, RENDER_URL_PREFIX
+from app.config.metrics import METRICS_ENABLED
+from app.config.compression import COMPRESSION_ENABLED
+from app.routes import document_routes, contract_routes, settings_routes, contract_management_routes, diagnostics_routes, blob_routes, health_routes, metrics_routes, signer_routes
+from app.services.workers import shutdown_process_pool
+from app.services.render_jobs import render_queue
+from app.services.settings_cache import settings_cache
+from app.services.signing import backfill_signing_state
+from app.services.instrumentation import MetricsMiddleware
+from app.services.compression import CompressionMiddleware
 
 load_dotenv()
 
-app = FastAPI(title="PDF to Image Backend", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await connect()
+    await ensure_indexes(db)
+    await backfill_signing_state()
+    await render_queue.start()
+    await settings_cache.start()
+    yield
+    await settings_cache.stop()
+    await render_queue.stop()
+    shutdown_process_pool()
+    close()
+
+app = FastAPI(title="PDF to Image Backend", version="1.0.0", lifespan=lifespan)
 
 # CORS Setup
 origins = [
@@ -24,13 +50,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Read by browser clients for pagination and conditional requests.
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Added last so it wraps everything else, CORS included, and sees the bytes on the wire.
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Include Routers
 app.include_router(document_routes.router)
 app.include_router(contract_routes.router)
 app.include_router(settings_routes.router)
 app.include_router(contract_management_routes.router)
+app.include_router(diagnostics_routes.router)
+app.include_router(blob_routes.router)
+app.include_router(signer_routes.router)
+app.include_router(health_routes.router)
+if METRICS_ENABLED:
+    app.include_router(metrics_routes.router)
+
+# Rendered PDF pages
+os.makedirs(RENDER_DIR, exist_ok=True)
+app.mount(RENDER_URL_PREFIX, StaticFiles(directory=RENDER_DIR), name="images")
 
 @app.get("/")
 def read_root():
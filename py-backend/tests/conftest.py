@@ -0,0 +1,55 @@
+import os
+import shutil
+import tempfile
+import uuid
+
+# Tests run against the in-memory mongomock stand-in, or against a real server
+# when MONGO_TEST_URI is set (e.g. mongodb://localhost:27017). Aggregation
+# pipeline updates, arrayFilters and $unionWith only work on a real server;
+# tests using them are marked `mongodb` and skipped on the stand-in.
+#
+#     pip install -r requirements-dev.txt
+#     python -m pytest
+#     MONGO_TEST_URI=mongodb://localhost:27017 python -m pytest
+#
+# Configuration is read at import time, so the environment is set up before
+# any app module is imported.
+MONGO_TEST_URI = os.getenv("MONGO_TEST_URI")
+os.environ["MONGO_URI"] = MONGO_TEST_URI or "mongomock://"
+os.environ["DB_NAME"] = f"py_backend_test_{uuid.uuid4().hex[:8]}"
+os.environ["SETTINGS_CACHE_WATCH"] = "false"
+WORK_DIR = tempfile.mkdtemp(prefix="py-backend-tests-")
+for name in ("UPLOAD_DIR", "RENDER_DIR", "RENDER_CACHE_DIR", "FLATTEN_CACHE_DIR", "BLOB_DIR"):
+    os.environ[name] = os.path.join(WORK_DIR, name.lower())
+
+import pytest
+from fastapi.testclient import TestClient
+
+BUSINESS_ID = "test-business"
+
+def pytest_collection_modifyitems(config, items):
+    if MONGO_TEST_URI:
+        return
+    skip = pytest.mark.skip(reason="needs a real MongoDB server; set MONGO_TEST_URI")
+    for item in items:
+        if "mongodb" in item.keywords:
+            item.add_marker(skip)
+
+def pytest_sessionfinish(session, exitstatus):
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    if MONGO_TEST_URI and not MONGO_TEST_URI.startswith("mongomock://"):
+        from pymongo import MongoClient
+        with MongoClient(MONGO_TEST_URI) as client:
+            client.drop_database(os.environ["DB_NAME"])
+
+@pytest.fixture
+def client():
+    # Runs the app lifespan, so every test gets a freshly connected client.
+    from main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def business_id(client):
+    # A tenant of its own per test; the database is shared within a session.
+    return f"{BUSINESS_ID}-{uuid.uuid4().hex[:8]}"
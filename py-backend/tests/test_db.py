@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from app.config import db as db_module
+from app.config.db import db, connect, close, client_options, get_client
+
+@pytest.fixture(autouse=True)
+def closed():
+    close()
+    yield
+    close()
+
+def test_connect_creates_client_and_close_releases_it():
+    async def scenario():
+        await connect()
+        client = db_module._client
+        assert client is not None
+        # connect() is idempotent while a client is open.
+        await connect()
+        assert db_module._client is client
+        assert await db.command("ping")
+        close()
+        assert db_module._client is None
+        assert db_module._database is None
+    asyncio.run(scenario())
+
+def test_proxy_opens_a_client_on_first_use():
+    assert db_module._client is None
+    collection = db.documents
+    assert db_module._client is get_client()
+    assert collection.name == "documents"
+    assert db["contracts"].name == "contracts"
+
+def test_proxy_follows_reconnects():
+    async def scenario():
+        await connect()
+        first = db_module._database
+        close()
+        await connect()
+        assert db_module._database is not first
+        assert db.documents.database is db_module._database
+    asyncio.run(scenario())
+
+def test_client_options_leave_unset_values_to_the_driver(monkeypatch):
+    for name in ("MONGO_MAX_POOL_SIZE", "MONGO_MIN_POOL_SIZE", "MONGO_COMPRESSORS", "MONGO_READ_PREFERENCE", "MONGO_WRITE_CONCERN"):
+        monkeypatch.setattr(db_module, name, None)
+    options = client_options()
+    for name in ("maxPoolSize", "minPoolSize", "compressors", "readPreference", "w"):
+        assert name not in options
+    assert options["event_listeners"] == [db_module.pool_monitor]
+
+def test_client_options_from_environment(monkeypatch):
+    monkeypatch.setattr(db_module, "MONGO_MAX_POOL_SIZE", 20)
+    monkeypatch.setattr(db_module, "MONGO_COMPRESSORS", "zstd,zlib")
+    monkeypatch.setattr(db_module, "MONGO_READ_PREFERENCE", "secondaryPreferred")
+    monkeypatch.setattr(db_module, "MONGO_WRITE_CONCERN", "2")
+    options = client_options()
+    assert options["maxPoolSize"] == 20
+    assert options["compressors"] == "zstd,zlib"
+    assert options["readPreference"] == "secondaryPreferred"
+    assert options["w"] == 2
+    monkeypatch.setattr(db_module, "MONGO_WRITE_CONCERN", "majority")
+    assert client_options()["w"] == "majority"
@@ -0,0 +1,28 @@
+from pymongo.errors import ServerSelectionTimeoutError
+from app.routes import health_routes
+
+def test_liveness(client):
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+def test_readiness_reports_database_and_pool(client):
+    response = client.get("/health/ready")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ready"
+    assert body["database"]["ok"] is True
+    assert body["database"]["latencyMs"] >= 0
+    assert set(body["pool"]) == {"maxPoolSize", "checkedOut", "waiting", "servers"}
+
+class UnreachableDatabase:
+    async def command(self, name):
+        raise ServerSelectionTimeoutError("no servers")
+
+def test_readiness_fails_without_database(client, monkeypatch):
+    monkeypatch.setattr(health_routes, "db", UnreachableDatabase())
+    response = client.get("/health/ready")
+    assert response.status_code == 503
+    body = response.json()
+    assert body["status"] == "unavailable"
+    assert body["database"] == {"ok": False, "error": "no servers"}
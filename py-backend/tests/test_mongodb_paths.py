@@ -0,0 +1,82 @@
+import pytest
+
+# Endpoints built on server features mongomock lacks: aggregation pipeline
+# updates (signing), arrayFilters (element patches) and $unionWith (stats).
+pytestmark = pytest.mark.mongodb
+
+def create_document(client, business_id, **fields):
+    response = client.post(f"/api/documents?business_id={business_id}", json={"name": "Test", **fields})
+    assert response.status_code == 201
+    return response.json()
+
+def text_field(element_id, **fields):
+    return {"type": "text-field", "id": element_id, "x": 10, "y": 20, "width": 100, "height": 30, "page": 1, "content": "", **fields}
+
+def test_patch_elements(client, business_id):
+    document = create_document(client, business_id, canvasElements=[text_field("a"), text_field("b")])
+    url = f"/api/documents/{document['_id']}/elements?business_id={business_id}"
+    response = client.patch(url, json={"revision": 0, "operations": [
+        {"op": "move", "id": "a", "value": {"x": 50, "y": 60}},
+        {"op": "replace", "id": "b", "value": {"content": "hello"}},
+    ]})
+    assert response.status_code == 200
+    assert response.json()["revision"] == 1
+
+    stored = client.get(f"/api/documents/{document['_id']}?business_id={business_id}").json()
+    elements = {e["id"]: e for e in stored["canvasElements"]}
+    assert (elements["a"]["x"], elements["a"]["y"]) == (50, 60)
+    assert elements["b"]["content"] == "hello"
+
+    stale = client.patch(url, json={"revision": 0, "operations": [{"op": "remove", "id": "a"}]})
+    assert stale.status_code == 409
+    invalid = client.patch(url, json={"revision": 1, "operations": [{"op": "replace", "id": "b", "value": {"x": "left"}}]})
+    assert invalid.status_code == 422
+
+def test_signing_workflow(client, business_id):
+    document = create_document(client, business_id)
+    url = f"/api/documents/{document['_id']}?business_id={business_id}"
+    response = client.put(url, json={"status": "waiting", "signingOrder": True, "signers": [
+        {"name": "A", "email": "A@example.com", "type": "signer", "order": 1},
+        {"name": "B", "email": "b@example.com", "type": "approver", "order": 2},
+        {"name": "C", "email": "c@example.com", "type": "cc"},
+    ]})
+    assert response.status_code == 200
+    assert response.json()["pendingSigners"] == ["a@example.com"]
+
+    pending = client.get(f"/api/signers/a@example.com/pending?business_id={business_id}").json()
+    assert [d["_id"] for d in pending["items"]] == [document["_id"]]
+
+    sign_url = f"/api/documents/{document['_id']}/sign?business_id={business_id}"
+    assert client.post(sign_url, json={"email": "b@example.com"}).status_code == 409
+    signed = client.post(sign_url, json={"email": "a@example.com"}).json()
+    assert signed["pendingSigners"] == ["b@example.com"]
+    assert signed["progress"] == 50
+
+    # Clients cannot mark signers signed; the stored signature is kept.
+    forged = client.put(url, json={"signers": [
+        {"name": "A", "email": "a@example.com", "type": "signer", "order": 1},
+        {"name": "B", "email": "b@example.com", "type": "approver", "order": 2, "status": "signed"},
+    ]}).json()
+    assert [s.get("status") for s in forged["signers"]] == ["signed", None]
+    assert forged["pendingSigners"] == ["b@example.com"]
+
+    done = client.post(sign_url, json={"email": "b@example.com"}).json()
+    assert done["status"] == "completed"
+    assert done["progress"] == 100
+    assert done["pendingSigners"] == []
+
+def test_business_stats(client, business_id):
+    create_document(client, business_id)
+    create_document(client, business_id)
+    contract = {"name": "C", "status": "active", "value": 100.0, "currency": "USD", "business_id": business_id}
+    assert client.post(f"/api/contracts?business_id={business_id}", json=contract).status_code == 201
+
+    stats = client.post(f"/api/contract-management/stats/refresh?business_id={business_id}").json()
+    assert stats["documentsFilters"]["all"] == 2
+    assert stats["documentsFilters"]["draft"] == 2
+    assert stats["contractsFilters"]["active"] == 1
+    assert stats["stats"]["contractValue"] == 100.0
+
+    state = client.get(f"/api/contract-management?business_id={business_id}")
+    assert state.status_code == 200
+    assert state.json()["documentsTotal"] == 2